@@ -0,0 +1,36 @@
+(function () {
+  // Shared timing helpers (haiku.data.timing.js); no-ops when not loaded
+  const timer = window.HAIKU_TIMER || { now: () => 0, record: () => {} };
+
+  async function loadAnalytics() {
+    try {
+      const marks = { start: timer.now() };
+      const res = await fetch("/data/analytics.json");
+      const text = await res.text();
+      marks.fetched = timer.now();
+
+      const data = JSON.parse(text);
+      marks.parsed = timer.now();
+
+      // Precomputed corpus statistics (see build_environment.py --phase analytics)
+      window.HAIKU_ANALYTICS = data;
+      marks.indexed = timer.now();
+
+      timer.record("haiku.analytics.js", "analytics.json", marks, text);
+
+      console.log(
+        "[haiku.analytics.js] Loaded analytics.json for",
+        data.haiku_count,
+        "haiku"
+      );
+
+      document.dispatchEvent(new Event("haikuAnalyticsLoaded"));
+    } catch (err) {
+      console.error("[haiku.analytics.js] Failed to load analytics.json", err);
+      window.HAIKU_ANALYTICS = null;
+      document.dispatchEvent(new Event("haikuAnalyticsLoaded"));
+    }
+  }
+
+  loadAnalytics();
+})();
@@ -1,9 +1,17 @@
 (function () {
+  // Shared timing helpers (haiku.data.timing.js); no-ops when not loaded
+  const timer = window.HAIKU_TIMER || { now: () => 0, record: () => {} };
+
   async function loadCurrentHaiku() {
     try {
       // 1. Load the first-resort pointer (absolute, location-agnostic)
+      const marks = { start: timer.now() };
       const res = await fetch("/data/current_haiku.json");
-      const status = await res.json();
+      const text = await res.text();
+      marks.fetched = timer.now();
+
+      const status = JSON.parse(text);
+      marks.parsed = timer.now();
 
       // Preserve raw status for inspection/debugging
       window.HAIKU_CURRENT_STATUS = status;
@@ -15,10 +23,17 @@
 
       // Expose resolved path
       window.HAIKU_CURRENT_PATH = path;
+      marks.indexed = timer.now();
+
+      timer.record("haiku.current.js", "current_haiku.json", marks, text);
 
       // 2. Load exactly ONE haiku HTML file (absolute)
+      const htmlMarks = { start: timer.now() };
       const htmlRes = await fetch(`/${path}`);
       const html = await htmlRes.text();
+      htmlMarks.fetched = htmlMarks.parsed = htmlMarks.indexed = timer.now();
+
+      timer.record("haiku.current.js", path, htmlMarks, html);
 
       // Expose HTML only — no interpretation
       window.HAIKU_CURRENT_HTML = html;
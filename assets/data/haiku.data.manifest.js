@@ -1,14 +1,25 @@
 (function () {
+  // Shared timing helpers (haiku.data.timing.js); no-ops when not loaded
+  const timer = window.HAIKU_TIMER || { now: () => 0, record: () => {} };
+
   async function loadManifest() {
     try {
+      const marks = { start: timer.now() };
       const res = await fetch("/data/manifest.json");
-      const data = await res.json();
+      const text = await res.text();
+      marks.fetched = timer.now();
+
+      const data = JSON.parse(text);
+      marks.parsed = timer.now();
 
       // Keep original for debugging
       window.MANIFEST = data;
 
       // Normalize into what index.html / explorer.html expect
       window.HAIKU_ALL = data.items || [];
+      marks.indexed = timer.now();
+
+      timer.record("haiku.manifest.js", "manifest.json", marks, text);
 
       console.log(
         "[haiku.manifest.js] Loaded manifest.json with",
@@ -1,8 +1,16 @@
 (function () {
+  // Shared timing helpers (haiku.data.timing.js); no-ops when not loaded
+  const timer = window.HAIKU_TIMER || { now: () => 0, record: () => {} };
+
   async function loadTags() {
     try {
+      const marks = { start: timer.now() };
       const res = await fetch("/data/tags.json");
-      const data = await res.json();
+      const text = await res.text();
+      marks.fetched = timer.now();
+
+      const data = JSON.parse(text);
+      marks.parsed = timer.now();
 
       // Keep original for debugging
       window.TAGS = data;
@@ -13,6 +21,9 @@
       (data.tags || []).forEach(t => {
         window.HAIKU_TAG_INDEX[t.tag] = t.files;
       });
+      marks.indexed = timer.now();
+
+      timer.record("haiku.tags.js", "tags.json", marks, text);
 
       console.log(
         "[haiku.tags.js] Loaded tags.json with",
@@ -32,4 +43,3 @@
 
   loadTags();
 })();
-
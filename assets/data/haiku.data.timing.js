@@ -0,0 +1,27 @@
+(function () {
+  // Optional timing mode for the haiku.data.*.js loaders:
+  // ?timing in the URL or window.HAIKU_TIMING = true
+  const enabled =
+    window.HAIKU_TIMING === true || /[?&]timing\b/.test(window.location.search);
+
+  function now() {
+    return window.performance.now();
+  }
+
+  // Record one artifact load. marks holds start/fetched/parsed/indexed
+  // timestamps; bytes is the UTF-8 size of the response body.
+  function record(source, name, marks, text) {
+    if (!enabled) return;
+    const t = {
+      fetch_ms: marks.fetched - marks.start,
+      parse_ms: marks.parsed - marks.fetched,
+      index_ms: marks.indexed - marks.parsed,
+      bytes: new window.TextEncoder().encode(text).length
+    };
+    window.HAIKU_TIMINGS = window.HAIKU_TIMINGS || {};
+    window.HAIKU_TIMINGS[name] = t;
+    console.log(`[${source}] timing`, name, t);
+  }
+
+  window.HAIKU_TIMER = { enabled, now, record };
+})();
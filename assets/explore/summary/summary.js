@@ -1,35 +1,69 @@
 // Summary behavior only.
-// Reads data/current_haiku.json and renders the page.
-
-document.addEventListener("DOMContentLoaded", () => {
-  fetch("/data/current_haiku.json", { cache: "no-store" })
-    .then(res => {
-      if (!res.ok) throw new Error("Failed to load current_haiku.json");
-      return res.json();
-    })
-    .then(data => {
-      const display = document.querySelector(".summary-display");
-      const countEl = document.getElementById("summary-count");
-
-      if (display && data.current_haiku && data.current_haiku.path_html) {
-        fetch("/" + data.current_haiku.path_html)
-          .then(r => r.text())
-          .then(html => {
-            const cleaned = html
-              .replaceAll("{{tags}}", "")
-              .replace(/^Tags:.*$/gmi, "");
-            display.innerHTML = cleaned;
-          })
-          .catch(err => console.error(err));
-      }
-
-      if (countEl && typeof data.current_count === "number") {
-        countEl.textContent =
-          `${data.current_count.toLocaleString()} haiku in the hall`;
-      }
-    })
-    .catch(err => {
-      // Quiet failure: summary should never break the page
-      console.error(err);
-    });
-});
+// Reads data/current_haiku.json and renders the page; corpus statistics
+// come from data/analytics.json via haiku.data.analytics.js.
+
+(function () {
+  function renderSummaryStats() {
+    const statsEl = document.getElementById("summary-stats");
+    const data = window.HAIKU_ANALYTICS;
+    if (!statsEl || !data || !data.haiku_count) return;
+
+    const names = list => list.slice(0, 5).map(([name]) => name).join(", ");
+    const conforming = Math.round(
+      (100 * data.lines.pattern_conforming) / data.haiku_count
+    );
+
+    const rows = [
+      [data.lines.syllable_pattern.join("-"), `${conforming}% of haiku`],
+      ["Top tags", names(data.tags.top)],
+      ["Top words", names(data.words.top)]
+    ];
+
+    statsEl.replaceChildren();
+    for (const [label, value] of rows) {
+      const dt = document.createElement("dt");
+      const dd = document.createElement("dd");
+      dt.textContent = label;
+      dd.textContent = value;
+      statsEl.append(dt, dd);
+    }
+  }
+
+  // Analytics may load before or after this script runs
+  document.addEventListener("haikuAnalyticsLoaded", renderSummaryStats);
+
+  document.addEventListener("DOMContentLoaded", () => {
+    renderSummaryStats();
+
+    fetch("/data/current_haiku.json", { cache: "no-store" })
+      .then(res => {
+        if (!res.ok) throw new Error("Failed to load current_haiku.json");
+        return res.json();
+      })
+      .then(data => {
+        const display = document.querySelector(".summary-display");
+        const countEl = document.getElementById("summary-count");
+
+        if (display && data.current_haiku && data.current_haiku.path_html) {
+          fetch("/" + data.current_haiku.path_html)
+            .then(r => r.text())
+            .then(html => {
+              const cleaned = html
+                .replaceAll("{{tags}}", "")
+                .replace(/^Tags:.*$/gmi, "");
+              display.innerHTML = cleaned;
+            })
+            .catch(err => console.error(err));
+        }
+
+        if (countEl && typeof data.current_count === "number") {
+          countEl.textContent =
+            `${data.current_count.toLocaleString()} haiku in the hall`;
+        }
+      })
+      .catch(err => {
+        // Quiet failure: summary should never break the page
+        console.error(err);
+      });
+  });
+})();
@@ -4,12 +4,22 @@ import json
 import logging
 from pathlib import Path
 from datetime import datetime, timezone
-import shutil
+import gzip
 from pathlib import PurePosixPath
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache, partial
 import nltk
 from nltk import word_tokenize, pos_tag
 
+from haiku_analytics import CorpusColumns, load_themes, summarize
+from haiku_archive import ContentArchive, hash_bytes
+from haiku_corpus import HaikuCorpus
+from haiku_similarity import SimilarityIndex, DEFAULT_THRESHOLD
+from haiku_sqlite import CorpusIndex
+
 # POS tags we allow (nouns + adjectives)
 NLTK_POS_ALLOW = {
     "NN", "NNS", "NNP", "NNPS",
@@ -65,6 +75,17 @@ STOPWORDS = {
     "is", "was", "that", "this", "these", "them"
 }
 
+# ----------------------------
+# POS gate helper
+# ----------------------------
+@lru_cache(maxsize=None)
+def is_tag_pos(word):
+    """
+    Intrinsic POS gate: tag a single word in isolation.
+    The result depends on the word only, so it is memoized.
+    """
+    return pos_tag([word])[0][1] in NLTK_POS_ALLOW
+
 # ----------------------------
 # filter word by POS helper
 # ----------------------------
@@ -90,8 +111,7 @@ def filter_words_by_pos(words, text):
             continue
 
         # intrinsic POS gate (authoritative)
-        w_pos = pos_tag([w])[0][1]
-        if w_pos not in NLTK_POS_ALLOW:
+        if not is_tag_pos(w):
             continue
 
         filtered.append(w)
@@ -125,24 +145,97 @@ def filter_existing_tags_nltk(tags, text=None):
             continue
 
         # intrinsic POS gate (authoritative)
-        tag_pos = pos_tag([tag_lc])[0][1]
-        if tag_pos not in NLTK_POS_ALLOW:
+        if not is_tag_pos(tag_lc):
             continue
 
         filtered.append(tag)
 
     return sorted(set(filtered))
 
+# ----------------------------
+# Date scope helpers
+# ----------------------------
+def parse_date_arg(value: str) -> str:
+    """
+    Parse a YYYY-MM-DD (or YYYYMMDD) date argument into YYYY-MM-DD.
+    """
+    try:
+        fmt = "%Y-%m-%d" if "-" in value else "%Y%m%d"
+        return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Invalid date: {value}") from exc
+
+def parse_month_arg(value: str) -> str:
+    try:
+        return datetime.strptime(value, "%Y-%m").strftime("%Y-%m")
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Invalid month (YYYY-MM): {value}") from exc
+
+def resolve_scope(args):
+    """
+    Combine --year, --month, --from and --to into an inclusive
+    (start, end) pair of YYYY-MM-DD strings, or None for the whole tree.
+    """
+    start, end = "0000-00-00", "9999-99-99"
+
+    if args.year:
+        start, end = max(start, f"{args.year:04d}-01-01"), min(end, f"{args.year:04d}-12-31")
+    if args.month:
+        start, end = max(start, f"{args.month}-01"), min(end, f"{args.month}-31")
+    if args.date_from:
+        start = max(start, args.date_from)
+    if args.date_to:
+        end = min(end, args.date_to)
+
+    if (start, end) == ("0000-00-00", "9999-99-99"):
+        return None
+    if start > end:
+        raise SystemExit(f"ERROR: empty date scope {start} .. {end}")
+    return start, end
+
+def in_scope(date_str: str, scope) -> bool:
+    return scope is None or scope[0] <= date_str <= scope[1]
+
+def id_date(haiku_id: str) -> str:
+    # 20190808-01 -> 2019-08-08
+    return f"{haiku_id[:4]}-{haiku_id[4:6]}-{haiku_id[6:8]}"
+
+def iter_day_dirs(data_dir: Path, scope):
+    """
+    Yield data/YYYY/MM/DD directories within scope, pruning whole years
+    and months that fall outside it.
+    """
+    start, end = scope
+    for year_dir in sorted(data_dir.glob("[0-9][0-9][0-9][0-9]")):
+        year = year_dir.name
+        if not start[:4] <= year <= end[:4]:
+            continue
+        for month_dir in sorted(year_dir.glob("[0-9][0-9]")):
+            month = f"{year}-{month_dir.name}"
+            if not start[:7] <= month <= end[:7]:
+                continue
+            for day_dir in sorted(month_dir.glob("[0-9][0-9]")):
+                if start <= f"{month}-{day_dir.name}" <= end:
+                    yield day_dir
+
+def iter_haiku_json(data_dir: Path, scope=None):
+    """
+    Yield per-haiku JSON files, limited to the date scope when one is given.
+    """
+    if scope is None:
+        yield from data_dir.rglob("haiku.*.json")
+        return
+    for day_dir in iter_day_dirs(data_dir, scope):
+        yield from sorted(day_dir.glob("haiku.*.json"))
+
 # ----------------------------
 # Clean helpers
 # ----------------------------
-def clean_pages(data_dir: Path):
-    for f in data_dir.rglob("*.html"):
-        if f.is_file():
-            f.unlink()
-    for f in data_dir.rglob("*.json"):
-        if f.is_file():
-            f.unlink()
+def clean_pages(data_dir: Path, scope):
+    for day_dir in iter_day_dirs(data_dir, scope):
+        for f in day_dir.glob("haiku.*"):
+            if f.is_file() and f.suffix in (".html", ".json"):
+                f.unlink()
 
 def clean_tags(data_dir: Path):
     tags_file = data_dir / "tags.json"
@@ -154,44 +247,200 @@ def clean_manifest(data_dir: Path):
     if manifest_file.exists():
         manifest_file.unlink()
 
+def analytics_file(data_dir: Path, scope=None):
+    """
+    analytics.json for the whole corpus; scoped runs write a separate
+    analytics.<from>.<to>.json so the corpus-wide file is never replaced.
+    """
+    if scope is None:
+        return data_dir / "analytics.json"
+    return data_dir / f"analytics.{scope[0]}.{scope[1]}.json"
+
+def clean_analytics(data_dir: Path, scope=None):
+    analytics_path = analytics_file(data_dir, scope)
+    if analytics_path.exists():
+        analytics_path.unlink()
+
 # ----------------------------
-# Pages phase
+# Corpus model helper
 # ----------------------------
-def phase_pages(args, project_root, inbox_dir, archive_dir, assets_dir, data_dir):
+def load_corpus(project_root: Path, data_dir: Path, scope=None, tags=True, created=False):
     """
-    Phase: build haiku HTML and JSON pages from inbox .txt files only.
+    Load haiku JSON files (within scope) into the compact corpus model.
+    With tags, stored tags are re-filtered with the NLTK POS rules;
+    with created, creation timestamps are kept (index phase only).
     """
-    
-    data_dir.mkdir(parents=True, exist_ok=True)
-    
-    archive_dir.mkdir(parents=True, exist_ok=True)
-    
+    haiku_corpus = HaikuCorpus(PurePosixPath(data_dir.relative_to(project_root)))
+
+    for json_file in iter_haiku_json(data_dir, scope):
+        try:
+            with json_file.open(encoding="utf-8") as f:
+                data = json.load(f)
+
+            filtered_tags = ()
+            if tags:
+                raw_tags = data.get("tags", [])
+                text = " ".join(data.get("lines", []))
+                filtered_tags = filter_existing_tags_nltk(raw_tags, text)
+                logger.debug(
+                    f"{data['id']}: tags {len(raw_tags)} → {len(filtered_tags)}"
+                )
+
+            haiku_corpus.add(data, filtered_tags, created=created)
+
+        except Exception as e:
+            logger.error(f"Failed to read {json_file}: {e}")
+
+    return haiku_corpus
+
+# ----------------------------
+# Similarity index helper
+# ----------------------------
+def load_similarity_index(index_path: Path, project_root: Path, data_dir: Path):
+    """
+    Load the persisted near-duplicate index, building it from existing
+    haiku JSON files the first time.
+    """
+    if index_path.exists():
+        return SimilarityIndex.load(index_path)
+
+    logger.info(f"Building similarity index from {data_dir}")
+    index = SimilarityIndex()
+
+    haiku_corpus = load_corpus(project_root, data_dir, tags=False)
+    for haiku_id, record in zip(haiku_corpus.ids, haiku_corpus.records):
+        index.add(haiku_id, record.lines)
+
+    return index
+
+# ----------------------------
+# Page rendering helpers
+# ----------------------------
+def split_blocks(content: str):
+    """
+    Split inbox content into haiku (lists of lines) on the ### separator.
+    """
+    return [
+        block.strip().splitlines()
+        for block in re.split(r'^\s*###\s*$', content, flags=re.MULTILINE)
+        if block.strip()
+    ]
+
+def page_paths(data_dir: Path, date_str: str, seq: int):
+    out_dir = data_dir / Path(date_str.replace("-", "/"))
+    stem = f"haiku.{date_str}.{seq:02d}"
+    return out_dir / f"{stem}.html", out_dir / f"{stem}.json"
+
+def build_page(project_root, data_dir, template_text, date_str, seq, lines, title=None, created=None):
+    """
+    Extract tags, then write the JSON and HTML page for one haiku.
+    Returns the JSON data.
+    """
+    html_path, json_path = page_paths(data_dir, date_str, seq)
+    html_path.parent.mkdir(parents=True, exist_ok=True)
+
+    title = title or f"{date_str}.{seq:02d}"
+
+    # --- Extract tags (words minus stopwords) ---
+    all_text = " ".join(lines)
+
+    ### tags = get_words(all_text, stopwords=STOPWORDS, unique=True)
+    ### words = get_words(all_text, stopwords=None, unique=True)
+
+    words = get_words(all_text, stopwords=STOPWORDS, unique=True)
+    tags = filter_words_by_pos(words, all_text)
+
+    # Build JSON metadata
+    json_data = {
+        "id": f"{date_str.replace('-', '')}-{seq:02d}",
+        "date": date_str,
+        "seq": seq,
+        "title": title,
+        "lines": lines,
+        "tags": tags,
+        "path_html": str(PurePosixPath(html_path.relative_to(project_root))),
+        "path_json": str(PurePosixPath(json_path.relative_to(project_root))),
+        "created": created or datetime.now(timezone.utc).isoformat(),
+    }
+
+    # Render HTML
+    line_html = "\n".join(f"<p>{line}</p>" for line in lines)
+    html_out = template_text.replace("{{title}}", title)\
+                            .replace("{{date}}", date_str)\
+                            .replace("{{lines}}", line_html)\
+                            .replace("{{json}}", json.dumps(json_data, indent=2))
+
+    html_path.write_text(html_out, encoding="utf-8")
+    json_path.write_text(json.dumps(json_data, indent=2), encoding="utf-8")
+
+    logger.debug(f"Built {html_path} and {json_path}")
+    return json_data
+
+def load_template(args, assets_dir: Path):
     template_path = Path(args.template) if args.template else assets_dir / "haiku.template.html"
     if not template_path.exists():
         logger.error(f"Template not found: {template_path}")
-        return
+        return None
+    return template_path.read_text(encoding="utf-8")
 
-    template_text = template_path.read_text(encoding="utf-8")
+# ----------------------------
+# Pages phase
+# ----------------------------
+def phase_pages(args, project_root, inbox_dir, archive_dir, assets_dir, data_dir, index_dir, scope=None, corpus=None):
+    """
+    Phase: build haiku HTML and JSON pages from inbox .txt files only.
+    With a date scope, only inbox files dated within it are processed.
+    When a SQLite corpus index is open, every page built is upserted into it.
 
-    for inbox_file in inbox_dir.glob("*"):
-        if inbox_file.suffix.lower() != ".txt":
-            logger.debug(f"Skipping unsupported file: {inbox_file}")
-            continue
+    Returns the pages built as (json_data, is_new) pairs, from which main
+    refreshes current_haiku.json (None when nothing was attempted).
+    """
 
-        logger.info(f"Processing {inbox_file.name}")
+    if args.mode == "clean":
+        # pages are canonical and the archive cannot recreate all of them:
+        # only an explicit date scope removes any
+        if scope is None:
+            logger.info("Keeping pages (clean removes pages only with a date scope)")
+            return
+
+        clean_pages(data_dir, scope)
+        if corpus is not None:
+            corpus.delete_range(*scope)
+
+        similarity_path = index_dir / "similarity.json"
+        if similarity_path.exists():
+            similarity = SimilarityIndex.load(similarity_path)
+            for haiku_id in [i for i in similarity.signatures if in_scope(id_date(i), scope)]:
+                similarity.remove(haiku_id)
+            if similarity.dirty:
+                similarity.save(similarity_path)
+
+        logger.info(f"Removed generated pages ({scope[0]} .. {scope[1]})")
+
+        phase_current_haiku(project_root, data_dir, assets_dir, None,
+                            corpus if args.backend == "sqlite" else None)
+        return
 
-        # --- Load content ---
-        content = inbox_file.read_text(encoding="utf-8")
+    data_dir.mkdir(parents=True, exist_ok=True)
+    
+    archive = ContentArchive(archive_dir)
 
-        # --- Split into haikus (by explicit ### separator) ---
-        blocks = [
-            block.strip().splitlines()
-            for block in re.split(r'^\s*###\s*$', content, flags=re.MULTILINE)
-            if block.strip()
-        ]
+    template_text = load_template(args, assets_dir)
+    if template_text is None:
+        return
+
+    similarity_path = index_dir / "similarity.json"
+    similarity = None
+    if args.dedup != "off":
+        similarity = load_similarity_index(similarity_path, project_root, data_dir)
 
-        # --- Build pages ---
-        for lines in blocks:
+    built = []
+
+    try:
+        for inbox_file in sorted(inbox_dir.glob("*")):
+            if inbox_file.suffix.lower() != ".txt":
+                logger.debug(f"Skipping unsupported file: {inbox_file}")
+                continue
 
             # Try to parse date from filename (expects YYYYMMDD.txt)
             stem = inbox_file.stem
@@ -206,111 +455,366 @@ def phase_pages(args, project_root, inbox_dir, archive_dir, assets_dir, data_dir
                 # fallback: today
                 date_str = datetime.now().strftime("%Y-%m-%d")
 
-            rel_dir = Path(date_str.replace("-", "/"))
-            out_dir = data_dir / rel_dir
-            out_dir.mkdir(parents=True, exist_ok=True)
+            if not in_scope(date_str, scope):
+                logger.debug(f"Skipping out-of-scope file: {inbox_file.name} ({date_str})")
+                continue
+
+            # --- Skip content that was already ingested ---
+            raw = inbox_file.read_bytes()
+            previous = archive.get(hash_bytes(raw))
+            if previous is not None:
+                logger.info(
+                    f"Skipping {inbox_file.name}: already ingested as "
+                    f"{previous['name']} ({previous['object']})"
+                )
+                inbox_file.unlink()
+                continue
+
+            logger.info(f"Processing {inbox_file.name}")
+
+            # --- Load content ---
+            try:
+                content = raw.decode("utf-8")
+            except UnicodeDecodeError as e:
+                logger.error(f"Skipping {inbox_file.name}: not valid UTF-8 ({e}); left in inbox")
+                continue
+
+            # --- Split into haikus (by explicit ### separator) ---
+            blocks = split_blocks(content)
+
+            # --- Build pages ---
+            for lines in blocks:
 
-            existing = []
-            for p in out_dir.glob("haiku.*.*.json"):
-                m = re.search(r"\.(\d+)\.json$", p.name)
-                if m:
-                    existing.append(int(m.group(1)))
+                out_dir = data_dir / Path(date_str.replace("-", "/"))
 
-            seq = max(existing) + 1 if existing else 1
+                existing = []
+                for p in out_dir.glob("haiku.*.*.json"):
+                    m = re.search(r"\.(\d+)\.json$", p.name)
+                    if m:
+                        existing.append(int(m.group(1)))
 
-            title = args.title or f"{date_str}.{seq:02d}"
-            html_path = out_dir / f"haiku.{date_str}.{seq:02d}.html"
-            json_path = out_dir / f"haiku.{date_str}.{seq:02d}.json"
+                seq = max(existing) + 1 if existing else 1
 
-            if args.mode != "rebuild":
-                if html_path.exists() or json_path.exists():
-                    raise RuntimeError(
-                        f"Refusing to overwrite existing files: "
-                        f"{html_path.name}, {json_path.name}"
+                html_path, json_path = page_paths(data_dir, date_str, seq)
+
+                if args.mode != "rebuild":
+                    if html_path.exists() or json_path.exists():
+                        raise RuntimeError(
+                            f"Refusing to overwrite existing files: "
+                            f"{html_path.name}, {json_path.name}"
+                        )
+
+                haiku_id = f"{date_str.replace('-', '')}-{seq:02d}"
+
+                # --- Near-duplicate check against the whole corpus ---
+                if similarity is not None:
+                    matches = similarity.query(
+                        lines, threshold=args.dedup_threshold,
+                        exclude=haiku_id, limit=1,
                     )
+                    if matches:
+                        match_id, score = matches[0]
+                        logger.warning(
+                            f"{inbox_file.name}: near-duplicate of {match_id} "
+                            f"({score:.2f}): {' / '.join(lines)}"
+                        )
+                        if args.dedup == "reject":
+                            continue
 
-            # --- Extract tags (words minus stopwords) ---
-            all_text = " ".join(lines)
-
-            ### tags = get_words(all_text, stopwords=STOPWORDS, unique=True)
-            ### words = get_words(all_text, stopwords=None, unique=True)
-
-            words = get_words(all_text, stopwords=STOPWORDS, unique=True)
-            tags = filter_words_by_pos(words, all_text)
-
-            # Build JSON metadata
-            json_data = {
-                "id": f"{date_str.replace('-', '')}-{seq:02d}",
-                "date": date_str,
-                "seq": seq,
-                "title": title,
-                "lines": lines,
-                "tags": tags,
-                "path_html": str(PurePosixPath(html_path.relative_to(project_root))),
-                "path_json": str(PurePosixPath(json_path.relative_to(project_root))),
-                "created": datetime.now(timezone.utc).isoformat(),
-            }
+                is_new = not json_path.exists()
 
-            # Render HTML
-            line_html = "\n".join(f"<p>{line}</p>" for line in lines)
-            html_out = template_text.replace("{{title}}", title)\
-                                    .replace("{{date}}", date_str)\
-                                    .replace("{{lines}}", line_html)\
-                                    .replace("{{json}}", json.dumps(json_data, indent=2))
+                json_data = build_page(project_root, data_dir, template_text,
+                                       date_str, seq, lines, title=args.title)
 
-            html_path.write_text(html_out, encoding="utf-8")
-            json_path.write_text(json.dumps(json_data, indent=2), encoding="utf-8")
+                built.append((json_data, is_new))
 
-            logger.debug(f"Built {html_path} and {json_path}")
+                # the page is on disk: commit its row so a later failure
+                # (which rolls back the run's transaction) cannot drop it
+                if corpus is not None:
+                    corpus.upsert(json_data, json_data["tags"])
+                    corpus.commit()
 
-        # --- Archive input file ---
-        timestamp = datetime.now().strftime("%Y-%m-%d-%H%M%S")
-        archive_subdir = archive_dir / timestamp
-        archive_subdir.mkdir(parents=True, exist_ok=True)
-        shutil.move(str(inbox_file), archive_subdir / inbox_file.name)
-        logger.debug(f"Moved {inbox_file} to {archive_subdir}")
+                if similarity is not None:
+                    similarity.add(haiku_id, lines)
 
-    # --- Build Current_Haiku Json file ---
-    phase_current_haiku(project_root, data_dir, assets_dir)
+            # --- Archive input file (content-addressed) ---
+            record = archive.ingest(inbox_file, raw, date_str)
+            logger.debug(f"Archived {inbox_file.name} as {record['object']}")
+
+    finally:
+        # keep signatures of pages already built even when a later file fails
+        if similarity is not None and similarity.dirty:
+            similarity.save(similarity_path)
+
+    return built
 
 # ----------------------------
-# Tags phase
+# Replay phase
 # ----------------------------
-def phase_tags(args, data_dir: Path):
+def plan_replay(args, archive, scope=None):
+    """
+    Walk the archive in ingestion order and assign every haiku its
+    per-date sequence number up front.
+    Returns jobs of (date, first seq, [created], [title], blocks), one per
+    archived file, with one created timestamp and title (None for the
+    default) per haiku.
+    """
+    next_seq = {}
+    jobs = []
 
-    data_dir.mkdir(parents=True, exist_ok=True)
+    # with --dedup reject, drop repeats exactly as sequential ingestion would
+    similarity = SimilarityIndex() if args.dedup == "reject" else None
 
-    tags_json_path = data_dir / "tags.json"
+    for record in archive.replay_records():
+        date_str = record["date"]
+        if not in_scope(date_str, scope):
+            continue
+
+        try:
+            content = archive.object_path(record).read_text(encoding="utf-8")
+        except Exception as e:
+            logger.error(f"Failed to read archived {record['name']}: {e}")
+            continue
+
+        first = next_seq.get(date_str, 1)
+        blocks = []
+
+        for lines in split_blocks(content):
+            if similarity is not None:
+                haiku_id = f"{date_str.replace('-', '')}-{first + len(blocks):02d}"
+                if similarity.query(lines, threshold=args.dedup_threshold, limit=1):
+                    logger.debug(f"{record['name']}: skipping near-duplicate: {' / '.join(lines)}")
+                    continue
+                similarity.add(haiku_id, lines)
+            blocks.append(lines)
+
+        if blocks:
+            jobs.append((date_str, first, [record["ingested"]] * len(blocks),
+                         [None] * len(blocks), blocks))
+            next_seq[date_str] = first + len(blocks)
+
+    return jobs
+
+def existing_pages(data_dir: Path, date_str: str):
+    """
+    Map seq -> page JSON for the pages currently on disk for one date
+    (an empty dict for pages that cannot be read).
+    """
+    pages = {}
+    day_dir = data_dir / Path(date_str.replace("-", "/"))
+    for json_file in day_dir.glob("haiku.*.json"):
+        m = re.search(r"\.(\d+)\.json$", json_file.name)
+        if not m:
+            continue
+        try:
+            pages[int(m.group(1))] = json.loads(json_file.read_text(encoding="utf-8"))
+        except Exception as e:
+            logger.error(f"Failed to read {json_file}: {e}")
+            pages[int(m.group(1))] = {}
+    return pages
+
+def replay_pages(project_root, data_dir, template_text, job):
+    """
+    Worker: build the pages planned for one archived file.
+    """
+    date_str, first, created, titles, blocks = job
+    return [
+        build_page(project_root, data_dir, template_text,
+                   date_str, seq, lines, title=title, created=stamp)
+        for seq, (lines, stamp, title) in enumerate(zip(blocks, created, titles), start=first)
+    ]
+
+def phase_replay(args, project_root, archive_dir, assets_dir, data_dir, index_dir, scope=None, corpus=None):
+    """
+    Phase: regenerate haiku pages from archived inbox files, without
+    touching inbox/ or archive/.
+
+    Sequence numbers are planned sequentially in ingestion order; pages are
+    then rendered across a pool of worker processes. The created timestamp
+    is the recorded ingestion time, so replays are deterministic.
+
+    A date that already has pages is only rebuilt (--mode rebuild) when the
+    archive reproduces exactly those pages (same seqs, same lines); other
+    dates are left untouched and reported.
+    """
 
     if args.mode == "clean":
-        clean_tags(data_dir)
+        raise SystemExit("ERROR: --phase replay does not support --mode clean (use --phase pages)")
+
+    template_text = load_template(args, assets_dir)
+    if template_text is None:
         return
 
-    tags_map = {}
+    archive = ContentArchive(archive_dir)
+
+    undated = len(archive.by_hash) - len(archive.replay_records())
+    if undated:
+        logger.warning(
+            f"Skipping {undated} archived files without a date in their name; "
+            f"their haiku cannot be placed by replay"
+        )
 
-    for json_file in data_dir.rglob("*.json"):
-        if json_file.name in ("tags.json", "manifest.json"):
+    jobs = plan_replay(args, archive, scope)
+
+    planned = {}
+    for date_str, first, _, _, blocks in jobs:
+        day = planned.setdefault(date_str, {})
+        for seq, lines in enumerate(blocks, start=first):
+            day[seq] = lines
+
+    # --- Only (re)build dates the archive fully accounts for ---
+    occupied, differing, kept = [], [], {}
+    for date_str, pages in planned.items():
+        existing = existing_pages(data_dir, date_str)
+        if not existing:
             continue
+        if args.mode != "rebuild":
+            occupied.append(date_str)
+        elif {seq: page.get("lines") for seq, page in existing.items()} != pages:
+            differing.append(date_str)
+            logger.debug(
+                f"{date_str}: archive gives {len(pages)} pages, "
+                f"data/ has {len(existing)} that differ; leaving as is"
+            )
+        else:
+            # rebuilt pages keep their original creation time and title
+            for seq, page in existing.items():
+                kept[(date_str, seq)] = page
+
+    if occupied:
+        raise RuntimeError(
+            f"Refusing to overwrite pages on {len(occupied)} dates "
+            f"(first: {min(occupied)}); use --mode rebuild"
+        )
+
+    if differing:
+        logger.warning(
+            f"Leaving {len(differing)} dates untouched whose pages the archive "
+            f"does not reproduce (first: {min(differing)}; --verbose 1 lists them)"
+        )
+        skipped = set(differing)
+        jobs = [job for job in jobs if job[0] not in skipped]
+
+    def keep(date_str, first, values, field):
+        return [
+            kept.get((date_str, seq), {}).get(field) or value
+            for seq, value in enumerate(values, start=first)
+        ]
 
-        try:
-            with json_file.open(encoding="utf-8") as f:
-                data = json.load(f)
+    jobs = [
+        (date_str, first,
+         keep(date_str, first, stamps, "created"),
+         keep(date_str, first, titles, "title"),
+         blocks)
+        for date_str, first, stamps, titles, blocks in jobs
+    ]
 
-            raw_tags = data.get("tags", [])
-            text = " ".join(data.get("lines", []))
+    dates = sorted({job[0] for job in jobs})
 
-            filtered_tags = filter_existing_tags_nltk(raw_tags, text)
+    # --- Render pages in parallel ---
+    workers = args.workers or os.cpu_count() or 1
+    render = partial(replay_pages, project_root, data_dir, template_text)
 
-            for tag in filtered_tags:
-                tags_map.setdefault(tag, []).append(data["id"])
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(jobs) // (workers * 8))
+            results = list(pool.map(render, jobs, chunksize=chunksize))
+    else:
+        results = list(map(render, jobs))
 
-            if args.verbose:
-                logger.debug(
-                    f"{data['id']}: tags {len(raw_tags)} → {len(filtered_tags)}"
-                )
+    built = [json_data for pages in results for json_data in pages]
 
-        except Exception as e:
-            logger.error(f"Failed to process {json_file}: {e}")
+    logger.info(
+        f"Replayed {len(jobs)} archived files into {len(built)} pages "
+        f"(workers: {workers})"
+    )
+
+    # --- Bring derived indices in line with the regenerated pages ---
+    if corpus is not None:
+        for date_str in dates:
+            corpus.delete_range(date_str, date_str)
+        for json_data in built:
+            corpus.upsert(json_data, json_data["tags"])
+
+    if args.dedup != "off":
+        similarity_path = index_dir / "similarity.json"
+        similarity = load_similarity_index(similarity_path, project_root, data_dir)
+        replayed = set(dates)
+        for haiku_id in [i for i in similarity.signatures if id_date(i) in replayed]:
+            similarity.remove(haiku_id)
+        for json_data in built:
+            similarity.add(json_data["id"], json_data["lines"])
+        similarity.save(similarity_path)
+
+    phase_current_haiku(project_root, data_dir, assets_dir, None,
+                        corpus if args.backend == "sqlite" else None)
+
+# ----------------------------
+# Index phase
+# ----------------------------
+def phase_index(args, project_root: Path, data_dir: Path, corpus, scope=None):
+    """
+    Phase: (re)build the SQLite corpus index from existing haiku JSON files.
+    Tags are re-filtered with the same NLTK rules as the tags phase.
+    """
+
+    if scope is None:
+        corpus.clear()
+    else:
+        corpus.delete_range(*scope)
+
+    if args.mode == "clean":
+        logger.info(f"Cleared {corpus.path}")
+        return
+
+    haiku_corpus = load_corpus(project_root, data_dir, scope, created=True)
+
+    for hid in range(len(haiku_corpus)):
+        corpus.upsert(haiku_corpus.entry(hid), haiku_corpus.tags_of(hid))
+
+    logger.info(f"Indexed {len(haiku_corpus)} haiku into {corpus.path}")
+
+# ----------------------------
+# Tags phase
+# ----------------------------
+def phase_tags(args, data_dir: Path, scope=None, corpus=None, haiku_corpus=None):
+    """
+    Phase: build tags.json from the postings of the corpus model (or,
+    with --backend sqlite, of the SQLite index).
+    A scoped clean drops only the scope's haiku from the existing file.
+    """
+
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    tags_json_path = data_dir / "tags.json"
+
+    if args.mode == "clean":
+        if scope is None or not tags_json_path.exists():
+            clean_tags(data_dir)
+            return
+        # merge an empty result for the scope below
+        tags_map = {}
+
+    # SQLite backend: postings are already filtered and complete
+    elif corpus is not None:
+        tags_map = dict(corpus.tag_postings())
+        scope = None
+    else:
+        if haiku_corpus is None:
+            haiku_corpus = load_corpus(data_dir.parent, data_dir, scope)
+        tags_map = dict(haiku_corpus.tag_postings())
+
+    # --- Merge scoped results into the existing index ---
+    if scope is not None and tags_json_path.exists():
+        existing = json.loads(tags_json_path.read_text(encoding="utf-8"))
+        merged = {}
+        for entry in existing.get("tags", []):
+            kept = [i for i in entry["files"] if not in_scope(id_date(i), scope)]
+            if kept:
+                merged[entry["tag"]] = kept
+        for tag, files in tags_map.items():
+            merged.setdefault(tag, []).extend(files)
+        tags_map = merged
 
     tags_data = {"tags": []}
     for tag, files in tags_map.items():
@@ -330,45 +834,68 @@ def phase_tags(args, data_dir: Path):
 # ----------------------------
 # Current Haiku
 # ----------------------------
-def phase_current_haiku(project_root: Path, data_dir: Path, assets_dir: Path):
+def phase_current_haiku(project_root: Path, data_dir: Path, assets_dir: Path, built=None, corpus=None, haiku_corpus=None):
     """
     Build assets/current_haiku.json from existing haiku JSON files.
-    Triggered by phase_pages only.
-    """
-
-    haiku_entries = []
+    Triggered after the pages phase (and by replay and scoped cleans).
 
-    for json_file in data_dir.rglob("haiku.*.json"):
-        try:
-            with json_file.open(encoding="utf-8") as f:
-                data = json.load(f)
+    When built is given (a scoped pages run), its (json_data, is_new)
+    entries are merged into the existing file instead of rewalking data/.
+    With a SQLite corpus index, count and latest are queried from it;
+    otherwise the shared corpus model is used when one is loaded.
+    """
 
-            haiku_entries.append(data)
+    out_path = data_dir / "current_haiku.json"
 
-        except Exception as e:
-            logger.error(f"Failed to read {json_file}: {e}")
+    if corpus is not None:
+        latest = corpus.latest()
+        if latest is None:
+            logger.warning("No haiku entries found; skipping current_haiku.json")
+            return
+        out = {
+            "current_count": corpus.count(),
+            "current_haiku": {
+                "path_html": latest["path_html"]
+            }
+        }
+        out_path.write_text(json.dumps(out, indent=2), encoding="utf-8")
+        logger.info(f"Built {out_path}")
+        return
 
-    if not haiku_entries:
-        logger.warning("No haiku entries found; skipping current_haiku.json")
+    if built is not None and out_path.exists():
+        current = json.loads(out_path.read_text(encoding="utf-8"))
+        path_html = current["current_haiku"]["path_html"]
+        m = re.search(r"haiku\.(\d{4}-\d{2}-\d{2})\.(\d+)\.html$", path_html)
+        latest_key = (m.group(1), int(m.group(2))) if m else ("", 0)
+
+        for data, is_new in built:
+            if is_new:
+                current["current_count"] += 1
+            key = (data["date"], int(data["seq"]))
+            if key > latest_key:
+                latest_key = key
+                current["current_haiku"]["path_html"] = data["path_html"]
+
+        out_path.write_text(json.dumps(current, indent=2), encoding="utf-8")
+        logger.info(f"Updated {out_path}")
         return
 
-    # total count
-    current_count = len(haiku_entries)
+    if haiku_corpus is None:
+        haiku_corpus = load_corpus(project_root, data_dir, tags=False)
 
     # determine most recent by (date, seq)
-    latest = max(
-        haiku_entries,
-        key=lambda h: (h.get("date", ""), int(h.get("seq", 0)))
-    )
+    latest = haiku_corpus.latest()
+    if latest is None:
+        logger.warning("No haiku entries found; skipping current_haiku.json")
+        return
 
     out = {
-        "current_count": current_count,
+        "current_count": len(haiku_corpus),
         "current_haiku": {
-            "path_html": latest["path_html"]
+            "path_html": haiku_corpus.paths(latest)[0]
         }
     }
 
-    out_path = data_dir / "current_haiku.json"
     out_path.write_text(json.dumps(out, indent=2), encoding="utf-8")
 
     logger.info(f"Built {out_path}")
@@ -376,11 +903,12 @@ def phase_current_haiku(project_root: Path, data_dir: Path, assets_dir: Path):
 # ----------------------------
 # Manifest phase
 # ----------------------------
-def phase_manifest(args, project_root: Path, data_dir: Path, assets_dir: Path):
+def phase_manifest(args, project_root: Path, data_dir: Path, assets_dir: Path, scope=None, corpus=None, haiku_corpus=None):
     """
     Phase: build manifest.json from existing haiku JSON files in data_dir.
     Does not modify haiku HTML or haiku JSON files.
     Applies NLTK POS-based filtering (nouns + adjectives) to existing tags only.
+    A scoped clean drops only the scope's haiku from the existing file.
     """
 
     data_dir.mkdir(parents=True, exist_ok=True)
@@ -388,53 +916,152 @@ def phase_manifest(args, project_root: Path, data_dir: Path, assets_dir: Path):
     manifest_path = data_dir / "manifest.json"
 
     if args.mode == "clean":
-        if manifest_path.exists():
-            manifest_path.unlink()
-            logger.info(f"Removed {manifest_path}")
-        return
+        if scope is None or not manifest_path.exists():
+            if manifest_path.exists():
+                manifest_path.unlink()
+                logger.info(f"Removed {manifest_path}")
+            return
+        # merge an empty result for the scope below
+        items = []
+
+    # SQLite backend: items are already filtered and complete
+    elif corpus is not None:
+        items = corpus.manifest_items()
+        scope = None
+    else:
+        if haiku_corpus is None:
+            haiku_corpus = load_corpus(project_root, data_dir, scope)
+        items = haiku_corpus.manifest_items()
 
     manifest = {
         "generated": datetime.now(timezone.utc).isoformat(),
-        "items": [],
+        "items": items,
     }
 
-    for json_file in data_dir.rglob("*.json"):
-        if json_file.name in ("manifest.json", "tags.json"):
-            continue
+    # --- Merge scoped results into the existing manifest ---
+    if scope is not None and manifest_path.exists():
+        existing = json.loads(manifest_path.read_text(encoding="utf-8"))
+        kept = [
+            item for item in existing.get("items", [])
+            if not in_scope(id_date(item["id"]), scope)
+        ]
+        manifest["items"] = kept + manifest["items"]
 
-        try:
-            with json_file.open(encoding="utf-8") as f:
-                entry = json.load(f)
-
-            raw_tags = entry.get("tags", [])
-            text = " ".join(entry.get("lines", []))
-            filtered_tags = filter_existing_tags_nltk(raw_tags, text)
-
-            item = {
-                "id": entry.get("id"),
-                "title": entry.get("title", ""),
-                "path_html": str(Path(entry["path_html"]).as_posix()),
-                "path_json": str(Path(entry["path_json"]).as_posix()),
-                "tags": filtered_tags,
-            }
+    manifest_path.write_text(
+        json.dumps(manifest, indent=2),
+        encoding="utf-8"
+    )
 
-            manifest["items"].append(item)
+    logger.info(f"Built {manifest_path}")
 
-            if args.verbose:
-                logger.debug(
-                    f"{entry.get('id')}: manifest tags "
-                    f"{len(raw_tags)} → {len(filtered_tags)}"
-                )
+# ----------------------------
+# Analytics phase
+# ----------------------------
+def phase_analytics(args, project_root: Path, data_dir: Path, scope=None, corpus=None, haiku_corpus=None):
+    """
+    Phase: build analytics.json with corpus-level statistics for the explorer
+    (word frequencies, tag trends, theme distribution, line and syllable
+    distributions). With a date scope, statistics cover only the scope and
+    are written to their own file (see analytics_file).
+    """
 
-        except Exception as e:
-            logger.error(f"Failed to process {json_file}: {e}")
+    data_dir.mkdir(parents=True, exist_ok=True)
 
-    manifest_path.write_text(
-        json.dumps(manifest, indent=2),
+    analytics_path = analytics_file(data_dir, scope)
+
+    if args.mode == "clean":
+        clean_analytics(data_dir, scope)
+        return
+
+    if corpus is not None:
+        haiku_corpus = HaikuCorpus.from_entries(
+            entry for entry in corpus.entries() if in_scope(entry["date"], scope)
+        )
+    elif haiku_corpus is None:
+        haiku_corpus = load_corpus(project_root, data_dir, scope)
+
+    columns = CorpusColumns(haiku_corpus)
+    themes = load_themes(project_root / "config" / "themes")
+
+    summary = summarize(columns, themes, stopwords=STOPWORDS, scope=scope)
+
+    analytics_path.write_text(
+        json.dumps(summary, separators=(",", ":")),
         encoding="utf-8"
     )
 
-    logger.info(f"Built {manifest_path}")
+    logger.info(f"Built {analytics_path} ({columns.count} haiku)")
+
+# ----------------------------
+# Artifact size report
+# ----------------------------
+# Aggregate artifacts fetched by assets/data/haiku.data.*.js
+CLIENT_ARTIFACTS = ("current_haiku.json", "manifest.json", "tags.json", "analytics.json")
+
+def parse_budget_arg(value: str):
+    """
+    Parse a size budget: "KB" for every artifact, or "NAME=KB" for one.
+    """
+    name, _, kb = value.rpartition("=")
+    try:
+        return name or None, float(kb)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Invalid size budget: {value}") from exc
+
+def report_artifact_sizes(args, data_dir: Path, scope=None):
+    """
+    Write build_report.json with raw and gzip sizes of each client-facing
+    artifact, and fail the build when an artifact exceeds its budget.
+    Scoped runs report the analytics file they wrote (see analytics_file);
+    its budget is the one given for analytics.json.
+    """
+    budgets = dict(args.size_budget or [])
+    default_budget = budgets.pop(None, None)
+
+    report = {
+        "generated": datetime.now(timezone.utc).isoformat(),
+        "artifacts": [],
+    }
+    over = []
+
+    for artifact in CLIENT_ARTIFACTS:
+        path = data_dir / artifact
+        if artifact == "analytics.json":
+            path = analytics_file(data_dir, scope)
+        if not path.exists():
+            continue
+
+        name = path.name
+        raw = path.read_bytes()
+        budget_kb = budgets.get(artifact, default_budget)
+        entry = {
+            "name": name,
+            "bytes": len(raw),
+            "gzip_bytes": len(gzip.compress(raw)),
+            "budget_kb": budget_kb,
+        }
+        entry["over_budget"] = budget_kb is not None and len(raw) > budget_kb * 1024
+        report["artifacts"].append(entry)
+
+        logger.info(
+            f"Size {name}: {entry['bytes'] / 1024:.1f} KB "
+            f"({entry['gzip_bytes'] / 1024:.1f} KB gzip)"
+            + (f", budget {budget_kb:g} KB" if budget_kb is not None else "")
+        )
+        if entry["over_budget"]:
+            over.append(entry)
+
+    report_path = data_dir / "build_report.json"
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    logger.info(f"Built {report_path}")
+
+    if over:
+        for entry in over:
+            logger.error(
+                f"{entry['name']} is {entry['bytes'] / 1024:.1f} KB, "
+                f"over its {entry['budget_kb']:g} KB budget"
+            )
+        raise SystemExit(1)
 
 # ----------------------------
 # Main
@@ -449,7 +1076,7 @@ def main():
 
     parser.add_argument("--template", help="Path to haiku.template.html")
 
-    parser.add_argument("--phase", choices=["all", "pages", "manifest", "tags"],
+    parser.add_argument("--phase", choices=["all", "pages", "replay", "manifest", "tags", "index", "analytics"],
                         default="all", help="Which phase(s) to run")
 
     parser.add_argument("--verbose", type=int, default=0,
@@ -459,6 +1086,35 @@ def main():
                         default="create",
                         help="Mode of operation: create (default), rebuild (overwrite), clean (remove generated data)")
 
+    parser.add_argument("--from", dest="date_from", type=parse_date_arg,
+                        help="Limit phases to haiku dated on or after YYYY-MM-DD")
+
+    parser.add_argument("--to", dest="date_to", type=parse_date_arg,
+                        help="Limit phases to haiku dated on or before YYYY-MM-DD")
+
+    parser.add_argument("--year", type=int,
+                        help="Limit phases to a single year (YYYY)")
+
+    parser.add_argument("--month", type=parse_month_arg,
+                        help="Limit phases to a single month (YYYY-MM)")
+
+    parser.add_argument("--backend", choices=["files", "sqlite"], default="files",
+                        help="Source for aggregate phases: files (walk data/, default) or sqlite (index/haiku.sqlite)")
+
+    parser.add_argument("--size-budget", action="append", type=parse_budget_arg,
+                        metavar="[NAME=]KB",
+                        help="Fail the build when an artifact exceeds KB (repeatable; NAME limits it to one artifact)")
+
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Worker processes for the replay phase (default: CPU count)")
+
+    parser.add_argument("--dedup", choices=["off", "flag", "reject"],
+                        default="flag",
+                        help="Near-duplicate handling in pages phase: off, flag (warn, default), reject (skip)")
+
+    parser.add_argument("--dedup-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Similarity at which haiku count as near-duplicates (default: {DEFAULT_THRESHOLD})")
+
     args = parser.parse_args()
 
     # logging setup
@@ -474,21 +1130,68 @@ def main():
     archive_dir = project_root / "archive"
     data_dir = project_root / "data"
     assets_dir = project_root / "assets"
+    index_dir = project_root / "index"
 
     logger.info(f"Project root: {project_root}")
     logger.info(f"Inbox:   {inbox_dir}")
     logger.info(f"Archive: {archive_dir}")
     logger.info(f"Data:    {data_dir}")
     logger.info(f"Assets:  {assets_dir}")
+    logger.info(f"Index:   {index_dir}")
+
+    scope = resolve_scope(args)
+    if scope is not None:
+        logger.info(f"Scope:   {scope[0]} .. {scope[1]}")
+
+    # SQLite corpus index: opened when selected as backend, when being
+    # (re)built, or whenever it already exists so pages keep it in sync
+    corpus_path = index_dir / "haiku.sqlite"
+    use_corpus = args.backend == "sqlite" or args.phase == "index" or corpus_path.exists()
+    bootstrap = use_corpus and not corpus_path.exists() and args.phase != "index"
+
+    with (CorpusIndex(corpus_path) if use_corpus else nullcontext()) as corpus:
+
+        if bootstrap:
+            logger.info(f"Building corpus index {corpus_path}")
+            phase_index(args, project_root, data_dir, corpus)
+
+        if args.phase == "index":
+            phase_index(args, project_root, data_dir, corpus, scope)
+
+        # aggregate phases only read from the index with --backend sqlite
+        query = corpus if args.backend == "sqlite" else None
+
+        built = None
+        if args.phase in ("all", "pages"):
+            built = phase_pages(args, project_root, inbox_dir, archive_dir, assets_dir, data_dir, index_dir, scope, corpus)
+
+        if args.phase == "replay":
+            phase_replay(args, project_root, archive_dir, assets_dir, data_dir, index_dir, scope, corpus)
+
+        # file backend: aggregate phases share one compact corpus model
+        haiku_corpus = None
+        if query is None and args.mode != "clean" and args.phase in ("all", "tags", "manifest", "analytics"):
+            haiku_corpus = load_corpus(project_root, data_dir, scope)
+
+        # --- Build Current_Haiku Json file ---
+        # (scoped runs merge their pages into the existing pointer; the
+        # shared model only covers the scope, so it is not used for them)
+        if built is not None:
+            phase_current_haiku(project_root, data_dir, assets_dir,
+                                built if scope is not None else None,
+                                query, haiku_corpus if scope is None else None)
+
+        if args.phase in ("all", "tags"):
+            phase_tags(args, data_dir, scope, query, haiku_corpus)
 
-    if args.phase in ("all", "pages"):
-        phase_pages(args, project_root, inbox_dir, archive_dir, assets_dir, data_dir)
+        if args.phase in ("all", "manifest"):
+            phase_manifest(args, project_root, data_dir, assets_dir, scope, query, haiku_corpus)
 
-    if args.phase in ("all", "tags"):
-        phase_tags(args, data_dir)
+        if args.phase in ("all", "analytics"):
+            phase_analytics(args, project_root, data_dir, scope, query, haiku_corpus)
 
-    if args.phase in ("all", "manifest"):
-        phase_manifest(args, project_root, data_dir, assets_dir)
+    if args.mode != "clean":
+        report_artifact_sizes(args, data_dir, scope)
 
 if __name__ == "__main__":
     main()
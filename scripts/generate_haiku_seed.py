@@ -2,12 +2,29 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import math
 import os
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import List, Optional, TextIO
 
 from openai import OpenAI
 
+from haiku_similarity import SimilarityIndex, DEFAULT_THRESHOLD
+from haiku_syllables import has_pronunciations, syllable_mismatches
+
+
+SEPARATOR = "###"
+
+BATCH_SUFFIX = """
+BATCH OVERRIDE:
+- Produce {count} distinct haiku instead of a single haiku.
+- Apply every rule above to each haiku independently.
+- Each haiku is three lines followed by its own ### line.
+- Output exactly {lines} lines in total.
+"""
+
 
 # =================================================
 # File loading
@@ -27,27 +44,81 @@ def compose_prompt(instructions_text: str, template_text: str) -> str:
     return instructions_text.replace("{{TEMPLATE}}", template_text)
 
 
+def compose_batch_prompt(prompt: str, count: int) -> str:
+    # The batch request is appended, so every call for a theme shares the
+    # same prompt prefix and stays eligible for provider-side prompt caching.
+    if count == 1:
+        return prompt
+    return prompt + BATCH_SUFFIX.format(count=count, lines=count * 4)
+
+
+def collect_themes(themes_dir: Path) -> List[Path]:
+    if not themes_dir.is_dir():
+        raise SystemExit(f"ERROR: THEMES directory not found: {themes_dir}")
+    themes = sorted(p for p in themes_dir.glob("*.txt") if p.is_file())
+    if not themes:
+        raise SystemExit(f"ERROR: no themes found in {themes_dir}")
+    return themes
+
+
+def theme_name(theme_path: Path) -> str:
+    # haiku.theme.birds.txt -> birds
+    return theme_path.stem.removeprefix("haiku.theme.")
+
+
 # =================================================
 # Validation
 # =================================================
 
-def validate_seed(text: str) -> None:
+def validate_seed(text: str, check_syllables: bool = True) -> None:
     lines = [myline.rstrip() for myline in text.strip().splitlines() if myline.strip()]
     if len(lines) != 4:
         raise ValueError("Invalid output: expected exactly 3 haiku lines + ###")
     if lines[-1] != "###":
         raise ValueError("Invalid output: final line must be ###")
 
+    if not check_syllables:
+        return
+
+    for number, line, expected, counts in syllable_mismatches(lines[:3]):
+        found = "/".join(str(c) for c in counts)
+        raise ValueError(
+            f"Invalid output: line {number} has {found} syllables, "
+            f"expected {expected}: {line!r}"
+        )
+
+
+def split_seeds(text: str) -> List[str]:
+    """
+    Split multi-haiku agent output on ### into individual seeds,
+    each terminated by its own ### line.
+    """
+    return [
+        f"{block.strip()}\n{SEPARATOR}"
+        for block in re.split(r"^\s*###\s*$", text, flags=re.MULTILINE)
+        if block.strip()
+    ]
+
+
+def seed_lines(seed: str) -> List[str]:
+    return [l.strip() for l in seed.splitlines() if l.strip() not in ("", SEPARATOR)]
+
 
 # =================================================
 # Agent call
 # =================================================
 
+@lru_cache(maxsize=None)
+def get_client(api_key: str) -> OpenAI:
+    # One client per process keeps the HTTP connection alive across calls
+    return OpenAI(api_key=api_key)
+
+
 def call_agent(agenturl: str, api_key: str, prompt: str) -> str:
     if agenturl.lower() != "openai":
         raise SystemExit(f"ERROR: unsupported agenturl '{agenturl}'")
 
-    client = OpenAI(api_key=api_key)
+    client = get_client(api_key)
 
     response = client.responses.create(
         model="gpt-4.1-mini",
@@ -61,6 +132,108 @@ def call_agent(agenturl: str, api_key: str, prompt: str) -> str:
     return response.output_text.strip()
 
 
+# =================================================
+# Generation
+# =================================================
+
+def generate_seeds(
+    args: argparse.Namespace,
+    api_key: str,
+    prompt: str,
+    out: TextIO,
+    similarity: Optional[SimilarityIndex],
+    strict: bool,
+    theme: str = "",
+) -> int:
+    """
+    Request seeds until args.number are accepted, streaming each accepted
+    seed to out. With strict, invalid output is fatal; otherwise it is
+    reported and dropped, and further calls are made (within a bound).
+    Returns the number of seeds written.
+    """
+    per_call = max(1, args.per_call)
+    max_calls = math.ceil(args.number / per_call) * (1 if strict else 2)
+
+    label = f"{theme}: " if theme else ""
+    accepted = 0
+    calls = 0
+
+    while accepted < args.number and calls < max_calls:
+        count = min(per_call, args.number - accepted)
+        calls += 1
+
+        if args.verbose:
+            print(f"[{label}call {calls}/{max_calls}] invoking agent for {count} haiku")
+
+        raw = call_agent(
+            agenturl=args.agenturl,
+            api_key=api_key,
+            prompt=compose_batch_prompt(prompt, count),
+        )
+
+        if args.verbose:
+            print("=== RAW AGENT OUTPUT ===")
+            print(raw)
+            print("========================")
+
+        seeds = [raw] if count == 1 and strict else split_seeds(raw)
+
+        for seed in seeds[:count]:
+            try:
+                validate_seed(seed, check_syllables=not args.no_syllable_check)
+            except ValueError as e:
+                if strict:
+                    raise
+                print(f"{label}Rejected: {e}")
+                continue
+
+            if similarity is not None:
+                lines = seed_lines(seed)
+                matches = similarity.query(
+                    lines, threshold=args.dedup_threshold, limit=1
+                )
+                if matches:
+                    match_id, score = matches[0]
+                    print(f"{label}Rejected near-duplicate of {match_id} ({score:.2f}): "
+                          f"{' / '.join(lines)}")
+                    continue
+                # also catch repeats within this run (not persisted)
+                similarity.add(f"seed-{theme}-{accepted + 1}", lines)
+
+            out.write(seed + "\n")
+            accepted += 1
+
+        out.flush()
+
+    return accepted
+
+
+def generate_to_file(
+    args: argparse.Namespace,
+    api_key: str,
+    prompt: str,
+    out_file: Path,
+    similarity: Optional[SimilarityIndex],
+    strict: bool,
+    theme: str = "",
+) -> int:
+    """
+    Run generate_seeds into a .part file beside out_file and move it into
+    place only once the run succeeded with at least one seed, so a failed
+    run never leaves a partial file (e.g. in inbox/).
+    """
+    part_file = out_file.with_name(out_file.name + ".part")
+    try:
+        with part_file.open("w", encoding="utf-8") as out:
+            written = generate_seeds(args, api_key, prompt, out, similarity,
+                                     strict=strict, theme=theme)
+        if written:
+            part_file.replace(out_file)
+        return written
+    finally:
+        part_file.unlink(missing_ok=True)
+
+
 # =================================================
 # CLI
 # =================================================
@@ -70,25 +243,46 @@ def main() -> None:
         description="Generate haiku seeds using template preferences and instruction rules"
     )
 
-    parser.add_argument("--template", required=True, type=Path)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--template", type=Path)
+    source.add_argument("--themes", type=Path,
+                        help="Directory of theme templates; writes one seed file per theme")
+
     parser.add_argument("--instructions", required=True, type=Path)
     parser.add_argument("--agenturl", required=True)
     parser.add_argument("--dst", required=True, type=Path)
-    parser.add_argument("--number", type=int, default=1)
+    parser.add_argument("--number", type=int, default=1,
+                        help="Seeds to generate (per theme with --themes)")
+    parser.add_argument("--per-call", type=int, default=1,
+                        help="Haiku requested per agent call")
     parser.add_argument("--verbose", action="store_true")
     parser.add_argument("--dryrun", action="store_true")
+    parser.add_argument("--no-syllable-check", action="store_true",
+                        help="Skip the 5-7-5 syllable check")
+    parser.add_argument("--dedup-index", type=Path,
+                        help="Similarity index used to reject near-duplicate seeds")
+    parser.add_argument("--dedup-threshold", type=float, default=DEFAULT_THRESHOLD)
 
     args = parser.parse_args()
 
-    template_text = load_text(args.template, "TEMPLATE")
     instructions_text = load_text(args.instructions, "INSTRUCTIONS")
 
-    prompt = compose_prompt(instructions_text, template_text)
+    if args.themes:
+        templates = collect_themes(args.themes)
+    else:
+        templates = [args.template]
+
+    # Compose each prompt exactly once
+    prompts = [
+        compose_prompt(instructions_text, load_text(path, "TEMPLATE"))
+        for path in templates
+    ]
 
     if args.verbose or args.dryrun:
-        print("=== COMPOSED PROMPT ===")
-        print(prompt)
-        print("======================")
+        for prompt in prompts:
+            print("=== COMPOSED PROMPT ===")
+            print(compose_batch_prompt(prompt, min(args.per_call, args.number)))
+            print("======================")
 
     if args.dryrun:
         return
@@ -97,36 +291,48 @@ def main() -> None:
     if not api_key:
         raise SystemExit("ERROR: HAIKU_PROJECT_API_KEY is not set")
 
-    outputs: List[str] = []
+    # the spelling heuristic alone rejects valid seeds; fail before paying for calls
+    if not args.no_syllable_check and not has_pronunciations():
+        raise SystemExit(
+            "ERROR: cmudict is unavailable, so syllables cannot be checked reliably; "
+            "install it (python -m nltk.downloader cmudict) or pass --no-syllable-check"
+        )
 
-    for i in range(args.number):
-        if args.verbose:
-            print(f"[call {i + 1}/{args.number}] invoking agent")
+    similarity = None
+    if args.dedup_index:
+        similarity = SimilarityIndex.load_or_create(args.dedup_index)
 
-        seed = call_agent(
-            agenturl=args.agenturl,
-            api_key=api_key,
-            prompt=prompt,
-        )
+    if not args.themes:
+        out_file = args.dst
+        if out_file.is_dir():
+            out_file = out_file / "haiku_seeds.txt"
+
+        written = generate_to_file(args, api_key, prompts[0], out_file, similarity,
+                                   strict=args.per_call <= 1)
+
+        if not written:
+            raise SystemExit("ERROR: no seeds accepted; nothing written")
 
         if args.verbose:
-            print("=== RAW AGENT OUTPUT ===")
-            print(seed)
-            print("========================")
+            print(f"Wrote {written} seed(s) to {out_file}")
+        return
+
+    args.dst.mkdir(parents=True, exist_ok=True)
+    total = 0
 
-        validate_seed(seed)
-        outputs.append(seed)
+    for path, prompt in zip(templates, prompts):
+        name = theme_name(path)
+        out_file = args.dst / f"{name}.seeds.txt"
 
-    out_file = args.dst
-    if out_file.is_dir():
-        out_file = out_file / "haiku_seeds.txt"
+        written = generate_to_file(args, api_key, prompt, out_file, similarity,
+                                   strict=False, theme=name)
 
-    out_file.write_text("\n".join(outputs) + "\n", encoding="utf-8")
+        total += written
+        print(f"Wrote {written}/{args.number} seed(s) to {out_file}")
 
-    if args.verbose:
-        print(f"Wrote {args.number} seed(s) to {out_file}")
+    if not total:
+        raise SystemExit("ERROR: no seeds accepted; nothing written")
 
 
 if __name__ == "__main__":
     main()
-
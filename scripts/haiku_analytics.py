@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+haiku_analytics — corpus-level statistics for the explorer.
+
+Haiku words, tags and lines from the shared corpus model are laid out
+once as flat integer columns (one entry per word, tag or line
+occurrence, each pointing back at its haiku). Frequencies, trends and
+distributions are then computed with NumPy bincount/argsort over those
+columns rather than per-haiku loops.
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from haiku_corpus import WORD_RE, HaikuCorpus
+from haiku_syllables import HAIKU_SYLLABLES, line_syllables
+
+TOP_WORDS = 50
+TOP_WORDS_PER_YEAR = 20
+TOP_TAGS = 25
+
+
+# =================================================
+# Themes
+# =================================================
+
+def load_themes(themes_dir: Path) -> Dict[str, List[str]]:
+    """
+    Read config/themes/*.txt and return theme -> keywords (incl. anchor word).
+    Keywords are normalized to lowercase words; multi-word keywords ("soft
+    light") are kept as phrases and matched as consecutive words.
+    """
+    themes = {}
+    for path in sorted(themes_dir.glob("*.txt")):
+        fields = dict(
+            line.split("=", 1)
+            for line in path.read_text(encoding="utf-8").splitlines()
+            if "=" in line
+        )
+        name = fields.get("theme", path.stem).strip()
+        words = {
+            " ".join(WORD_RE.findall(w.lower()))
+            for key in ("keywords", "anchor_word")
+            for w in fields.get(key, "").split(",")
+            if WORD_RE.search(w)
+        }
+        themes[name] = sorted(words)
+    return themes
+
+
+# =================================================
+# Columns
+# =================================================
+
+class CorpusColumns:
+    """
+    Columnar view of the corpus: integer-coded words, tags and lines.
+    Word and tag ids are the corpus model's own.
+    """
+
+    def __init__(self, corpus: HaikuCorpus):
+        self.vocab: Dict[str, int] = corpus.word_ids
+        self.tag_vocab: Dict[str, int] = corpus.tag_ids
+        month_ids: Dict[str, int] = {}
+        line_cache: Dict[tuple, tuple] = {}
+
+        haiku_month, word_id, word_haiku, tag_id, tag_haiku = [], [], [], [], []
+        line_haiku, line_pos, line_chars, line_words, line_syll, line_ok = [], [], [], [], [], []
+
+        for n, record in enumerate(corpus.records):
+            haiku_month.append(month_ids.setdefault(record.date[:7], len(month_ids)))
+
+            word_id.extend(record.words)
+            word_haiku.extend([n] * len(record.words))
+
+            for pos, line in enumerate(record.lines):
+
+                # (count, ok) depends on the expected count, i.e. the position
+                stats = line_cache.get((line, pos))
+                if stats is None:
+                    totals = line_syllables(line)
+                    expected = HAIKU_SYLLABLES[pos] if pos < len(HAIKU_SYLLABLES) else None
+                    count = expected if expected in totals else min(totals)
+                    stats = line_cache[(line, pos)] = (count, expected in totals)
+
+                line_haiku.append(n)
+                line_pos.append(pos)
+                line_chars.append(len(line))
+                line_words.append(len(WORD_RE.findall(line)))
+                line_syll.append(stats[0])
+                line_ok.append(stats[1])
+
+            tag_id.extend(record.tags)
+            tag_haiku.extend([n] * len(record.tags))
+
+        # months are assigned in first-seen order; remap to sorted order
+        self.months = sorted(month_ids)
+        remap = np.empty(len(month_ids), dtype=np.int32)
+        for i, month in enumerate(self.months):
+            remap[month_ids[month]] = i
+
+        self.count = len(corpus)
+        self.haiku_month = remap[np.asarray(haiku_month, dtype=np.int32)]
+        self.word_id = np.asarray(word_id, dtype=np.int32)
+        self.word_haiku = np.asarray(word_haiku, dtype=np.int32)
+        self.tag_id = np.asarray(tag_id, dtype=np.int32)
+        self.tag_haiku = np.asarray(tag_haiku, dtype=np.int32)
+        self.line_haiku = np.asarray(line_haiku, dtype=np.int32)
+        self.line_pos = np.asarray(line_pos, dtype=np.int8)
+        self.line_chars = np.asarray(line_chars, dtype=np.int32)
+        self.line_words = np.asarray(line_words, dtype=np.int32)
+        self.line_syll = np.asarray(line_syll, dtype=np.int32)
+        self.line_ok = np.asarray(line_ok, dtype=bool)
+
+        self.words = np.array(corpus.word_names, dtype=object)
+        self.tags = np.array(corpus.tag_names, dtype=object)
+
+
+# =================================================
+# Statistics
+# =================================================
+
+def _top(labels: np.ndarray, counts: np.ndarray, k: int) -> List[list]:
+    order = np.argsort(-counts, kind="stable")[:k]
+    order = order[counts[order] > 0]
+    return [[labels[i], int(counts[i])] for i in order]
+
+
+def _phrase_haiku(cols: CorpusColumns, phrase: str) -> np.ndarray:
+    """
+    Haiku containing the words of phrase consecutively (in one haiku).
+    """
+    ids = [cols.vocab.get(w) for w in phrase.split()]
+    n = cols.word_id.size - len(ids) + 1
+    if None in ids or n <= 0:
+        return np.empty(0, dtype=np.int32)
+
+    match = np.ones(n, dtype=bool)
+    for k, wid in enumerate(ids):
+        match &= cols.word_id[k:k + n] == wid
+        match &= cols.word_haiku[k:k + n] == cols.word_haiku[:n]
+    return cols.word_haiku[:n][match]
+
+
+def _histograms(values: np.ndarray, positions: np.ndarray) -> List[List[list]]:
+    """
+    Per line position, a sparse histogram as [[value, count], ...].
+    """
+    out = []
+    for pos in range(len(HAIKU_SYLLABLES)):
+        h = np.bincount(values[positions == pos])
+        nz = np.flatnonzero(h)
+        out.append(np.column_stack((nz, h[nz])).tolist())
+    return out
+
+
+def summarize(
+    cols: CorpusColumns,
+    themes: Dict[str, List[str]],
+    stopwords: Iterable[str] = (),
+    scope: Optional[tuple] = None,
+) -> dict:
+    V, T, M = len(cols.vocab), len(cols.tag_vocab), len(cols.months)
+
+    # --- word frequencies (overall and per year) ---
+    is_stop = np.zeros(V, dtype=bool)
+    is_stop[[cols.vocab[w] for w in stopwords if w in cols.vocab]] = True
+
+    word_counts = np.bincount(cols.word_id, minlength=V)
+    word_counts[is_stop] = 0
+
+    years = sorted({m[:4] for m in cols.months})
+    month_year = np.array([years.index(m[:4]) for m in cols.months], dtype=np.int32)
+    word_year = month_year[cols.haiku_month[cols.word_haiku]]
+    by_year = np.bincount(word_year * V + cols.word_id, minlength=len(years) * V)
+    by_year = by_year.reshape(len(years), V)
+    by_year[:, is_stop] = 0
+
+    # --- tag trends per month ---
+    tag_month = cols.haiku_month[cols.tag_haiku]
+    tag_by_month = np.bincount(tag_month * T + cols.tag_id, minlength=M * T).reshape(M, T)
+    tag_totals = tag_by_month.sum(axis=0)
+    trend_ids = np.argsort(-tag_totals, kind="stable")[:TOP_TAGS]
+    trend_ids = trend_ids[tag_totals[trend_ids] > 0]
+
+    # --- theme distribution (haiku using any theme keyword) ---
+    theme_stats = {}
+    for name, keywords in themes.items():
+        ids = [cols.vocab[w] for w in keywords if w in cols.vocab]
+        hits = np.unique(np.concatenate(
+            [cols.word_haiku[np.isin(cols.word_id, ids)]]
+            + [_phrase_haiku(cols, w) for w in keywords if " " in w]
+        ))
+        theme_stats[name] = {
+            "keywords": keywords,
+            "count": int(hits.size),
+            "by_month": np.bincount(cols.haiku_month[hits], minlength=M).tolist(),
+        }
+
+    # --- syllable conformance (haiku with no failing line) ---
+    failing = np.bincount(cols.line_haiku[~cols.line_ok], minlength=cols.count)
+    conforming = int(np.count_nonzero(failing == 0))
+
+    return {
+        "generated": datetime.now(timezone.utc).isoformat(),
+        "scope": list(scope) if scope else None,
+        "haiku_count": cols.count,
+        "months": cols.months,
+        "haiku_per_month": np.bincount(cols.haiku_month, minlength=M).tolist(),
+        "words": {
+            "vocabulary": V,
+            "occurrences": int(cols.word_id.size),
+            "top": _top(cols.words, word_counts, TOP_WORDS),
+            "top_by_year": {
+                year: _top(cols.words, by_year[i], TOP_WORDS_PER_YEAR)
+                for i, year in enumerate(years)
+            },
+        },
+        "tags": {
+            "distinct": T,
+            "top": _top(cols.tags, tag_totals, TOP_TAGS),
+            "trend": {
+                "tags": [cols.tags[i] for i in trend_ids],
+                "counts": tag_by_month[:, trend_ids].T.tolist(),
+            },
+        },
+        "themes": theme_stats,
+        "lines": {
+            "chars": _histograms(cols.line_chars, cols.line_pos),
+            "words": _histograms(cols.line_words, cols.line_pos),
+            "syllables": _histograms(cols.line_syll, cols.line_pos),
+            "syllable_pattern": list(HAIKU_SYLLABLES),
+            "pattern_conforming": conforming,
+        },
+    }
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+haiku_archive — content-addressed archive of processed inbox files.
+
+Inbox files are stored once per distinct content under
+
+    archive/objects/<sha256[:2]>/<sha256><suffix>
+
+and every ingestion is appended to archive/ingest.log (one JSON record
+per line, never rewritten). The log is loaded into a dict keyed by
+content hash, so "was this content already ingested?" is an O(1) lookup.
+
+Legacy timestamped directories (archive/YYYY-MM-DD-HHMMSS/) are left in
+place; the first time the log is created they are recorded in it, in
+directory order, so re-ingest protection also covers historical input.
+
+Because the log records every input in order, with its date and
+ingestion time, the archive can also be replayed to regenerate data/.
+"""
+
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime, timezone
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("haiku-archive")
+
+LOG_NAME = "ingest.log"
+OBJECTS_DIR = "objects"
+
+LEGACY_DIR_RE = re.compile(r"^\d{4}-\d{2}-\d{2}-\d{6}$")
+DATE_NAME_RE = re.compile(r"^(\d{4})(\d{2})(\d{2})")
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def utc_timestamp(value: datetime) -> str:
+    """
+    ISO timestamp in UTC. Naive values are local wall-clock time of the
+    build host (as used for legacy archive directory names).
+    """
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def name_date(name: str) -> Optional[str]:
+    """
+    Date encoded in an inbox file name (YYYYMMDD...), as YYYY-MM-DD.
+    """
+    m = DATE_NAME_RE.match(name)
+    return f"{m.group(1)}-{m.group(2)}-{m.group(3)}" if m else None
+
+
+class ContentArchive:
+    """
+    Content-addressed store plus append-only ingest log.
+    """
+
+    def __init__(self, archive_dir: Path):
+        self.archive_dir = archive_dir
+        self.log_path = archive_dir / LOG_NAME
+        self.records: List[dict] = []
+        self.by_hash: Dict[str, dict] = {}
+
+        archive_dir.mkdir(parents=True, exist_ok=True)
+
+        if self.log_path.exists():
+            self._load()
+        else:
+            self._bootstrap_legacy()
+
+    def __contains__(self, sha256: str) -> bool:
+        return sha256 in self.by_hash
+
+    def get(self, sha256: str) -> Optional[dict]:
+        return self.by_hash.get(sha256)
+
+    # ----------------------------
+    # Log
+    # ----------------------------
+    def _load(self) -> None:
+        with self.log_path.open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    self._remember(json.loads(line))
+
+    def _remember(self, record: dict) -> None:
+        # logs written before timestamps were normalized may hold naive
+        # legacy times; ingested is always UTC with an offset
+        ingested = datetime.fromisoformat(record["ingested"])
+        if ingested.tzinfo is None:
+            record["ingested"] = utc_timestamp(ingested)
+
+        self.records.append(record)
+        # first ingestion of a given content wins
+        self.by_hash.setdefault(record["sha256"], record)
+
+    def _append(self, record: dict) -> None:
+        with self.log_path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record, sort_keys=True) + "\n")
+        self._remember(record)
+
+    def _bootstrap_legacy(self) -> None:
+        """
+        Record files in legacy timestamped directories (without moving them).
+        """
+        legacy = sorted(
+            d for d in self.archive_dir.iterdir()
+            if d.is_dir() and LEGACY_DIR_RE.match(d.name)
+        )
+
+        for legacy_dir in legacy:
+            ingested = utc_timestamp(datetime.strptime(legacy_dir.name, "%Y-%m-%d-%H%M%S"))
+            for path in sorted(p for p in legacy_dir.iterdir() if p.is_file()):
+                self._append({
+                    "sha256": hash_bytes(path.read_bytes()),
+                    "name": path.name,
+                    "date": name_date(path.name),
+                    "object": str(PurePosixPath(path.relative_to(self.archive_dir))),
+                    "ingested": ingested,
+                })
+
+        # create the log even when there is nothing to record
+        self.log_path.touch()
+        if legacy:
+            logger.info(
+                f"Recorded {len(self.records)} legacy archive files "
+                f"from {len(legacy)} directories in {self.log_path}"
+            )
+
+    # ----------------------------
+    # Ingestion
+    # ----------------------------
+    def ingest(self, path: Path, data: bytes, date: Optional[str] = None) -> dict:
+        """
+        Store data under its hash, log the ingestion and remove the inbox file.
+        """
+        sha256 = hash_bytes(data)
+        rel = PurePosixPath(OBJECTS_DIR, sha256[:2], sha256 + path.suffix.lower())
+        target = self.archive_dir / rel
+
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_suffix(target.suffix + ".tmp")
+            tmp.write_bytes(data)
+            tmp.replace(target)
+
+        record = {
+            "sha256": sha256,
+            "name": path.name,
+            "date": date,
+            "object": str(rel),
+            "ingested": datetime.now(timezone.utc).isoformat(),
+        }
+        self._append(record)
+
+        path.unlink()
+        return record
+
+    def object_path(self, record: dict) -> Path:
+        return self.archive_dir / record["object"]
+
+    # ----------------------------
+    # Replay
+    # ----------------------------
+    def replay_records(self) -> List[dict]:
+        """
+        First ingestion of each distinct content, in ingestion order,
+        limited to records that carry a date.
+        """
+        return [r for r in self.by_hash.values() if r.get("date")]
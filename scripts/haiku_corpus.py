@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+haiku_corpus — compact in-memory model of the haiku corpus.
+
+Corpus-wide phases (tags, manifest, current haiku, analytics, index and
+similarity bootstraps) load every haiku once into this model instead of
+keeping whole page JSON dicts:
+
+    ids       single table of haiku id strings; a haiku is an int index
+    records   one __slots__ HaikuRecord per haiku (date, seq, text,
+              word ids, tag ids)
+    words     interned word strings, each with an integer word id
+    tags      interned tag strings, each with an integer tag id
+    postings  per tag id, an array('I') of haiku indices
+
+Paths, ids and default titles follow the canonical data/ layout and are
+derived on demand rather than stored per haiku.
+"""
+
+import re
+import sys
+from array import array
+from pathlib import PurePosixPath
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+WORD_RE = re.compile(r"\b\w+\b")
+
+
+class HaikuRecord:
+    """
+    One haiku. Lines are stored joined by newlines; words (lowercased, in
+    order) and tags are ids into the corpus tables. title and created are
+    None unless kept (title only when non-default).
+    """
+
+    __slots__ = ("date", "seq", "text", "words", "tags", "title", "created")
+
+    def __init__(self, date: str, seq: int, text: str, words: array,
+                 tags: Tuple[int, ...], title: Optional[str] = None,
+                 created: Optional[str] = None):
+        self.date = date
+        self.seq = seq
+        self.text = text
+        self.words = words
+        self.tags = tags
+        self.title = title
+        self.created = created
+
+    @property
+    def lines(self) -> List[str]:
+        return self.text.split("\n") if self.text else []
+
+
+class HaikuCorpus:
+    """
+    Records, id table, interned word and tag tables and posting lists.
+    """
+
+    def __init__(self, data_prefix: str = "data"):
+        self.data_prefix = PurePosixPath(data_prefix)
+        self.ids: List[str] = []
+        self.records: List[HaikuRecord] = []
+        self.word_names: List[str] = []
+        self.word_ids: Dict[str, int] = {}
+        self.tag_names: List[str] = []
+        self.tag_ids: Dict[str, int] = {}
+        self.postings: List[array] = []
+        self._dates: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    # ----------------------------
+    # Loading
+    # ----------------------------
+    def word_id(self, word: str) -> int:
+        word_id = self.word_ids.get(word)
+        if word_id is None:
+            word_id = len(self.word_names)
+            word = sys.intern(word)
+            self.word_names.append(word)
+            self.word_ids[word] = word_id
+        return word_id
+
+    def tag_id(self, tag: str) -> int:
+        tag_id = self.tag_ids.get(tag)
+        if tag_id is None:
+            tag_id = len(self.tag_names)
+            tag = sys.intern(tag)
+            self.tag_names.append(tag)
+            self.tag_ids[tag] = tag_id
+            self.postings.append(array("I"))
+        return tag_id
+
+    def add(self, entry: dict, tags: Iterable[str] = (), created: bool = False) -> int:
+        """
+        Add one haiku from a page JSON dict (or index row) with the given
+        tags. Returns its integer id.
+        """
+        hid = len(self.records)
+        date = self._dates.setdefault(entry["date"], sys.intern(entry["date"]))
+        seq = int(entry["seq"])
+
+        title = entry.get("title")
+        if title == f"{date}.{seq:02d}":
+            title = None
+
+        text = "\n".join(entry.get("lines", []))
+        word_ids = array("I", map(self.word_id, WORD_RE.findall(text.lower())))
+
+        tag_ids = tuple(self.tag_id(tag) for tag in tags)
+        for tag_id in tag_ids:
+            self.postings[tag_id].append(hid)
+
+        self.ids.append(entry["id"])
+        self.records.append(HaikuRecord(
+            date, seq, text, word_ids, tag_ids,
+            title, entry.get("created") if created else None,
+        ))
+        return hid
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[dict]) -> "HaikuCorpus":
+        """
+        Build from dicts carrying id, date, seq, lines and (final) tags.
+        """
+        corpus = cls()
+        for entry in entries:
+            corpus.add(entry, entry.get("tags", []))
+        return corpus
+
+    # ----------------------------
+    # Derived fields
+    # ----------------------------
+    def tags_of(self, hid: int) -> List[str]:
+        return [self.tag_names[t] for t in self.records[hid].tags]
+
+    def title(self, hid: int) -> str:
+        record = self.records[hid]
+        return record.title or f"{record.date}.{record.seq:02d}"
+
+    def paths(self, hid: int) -> Tuple[str, str]:
+        """
+        Project-relative (path_html, path_json) of a haiku.
+        """
+        record = self.records[hid]
+        date = record.date
+        stem = self.data_prefix / date[:4] / date[5:7] / date[8:] / f"haiku.{date}.{record.seq:02d}"
+        return f"{stem}.html", f"{stem}.json"
+
+    def entry(self, hid: int) -> dict:
+        """
+        Page JSON dict for one haiku (created only if it was kept).
+        """
+        record = self.records[hid]
+        path_html, path_json = self.paths(hid)
+        return {
+            "id": self.ids[hid],
+            "date": record.date,
+            "seq": record.seq,
+            "title": self.title(hid),
+            "lines": record.lines,
+            "tags": self.tags_of(hid),
+            "path_html": path_html,
+            "path_json": path_json,
+            "created": record.created,
+        }
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def latest(self) -> Optional[int]:
+        """
+        Id of the most recent haiku by (date, seq), or None when empty.
+        """
+        if not self.records:
+            return None
+        return max(range(len(self.records)),
+                   key=lambda h: (self.records[h].date, self.records[h].seq))
+
+    def tag_postings(self) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Yield (tag, [haiku ids]) for every tag, in first-seen order.
+        """
+        ids = self.ids
+        for tag, posting in zip(self.tag_names, self.postings):
+            yield tag, [ids[h] for h in posting]
+
+    def manifest_items(self) -> List[dict]:
+        items = []
+        for hid in range(len(self.records)):
+            path_html, path_json = self.paths(hid)
+            items.append({
+                "id": self.ids[hid],
+                "title": self.title(hid),
+                "path_html": path_html,
+                "path_json": path_json,
+                "tags": self.tags_of(hid),
+            })
+        return items
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+haiku_similarity — near-duplicate detection across the haiku corpus.
+
+Each haiku is reduced to a MinHash signature over character shingles of
+its normalized text. Signatures are split into LSH bands so that a query
+only compares against haiku sharing at least one band, rather than the
+whole corpus. The index is persisted as JSON and updated incrementally.
+"""
+
+import base64
+import json
+import logging
+import random
+import re
+import zlib
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("haiku-similarity")
+
+INDEX_VERSION = 1
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 16
+SEED = 1
+
+# Estimated Jaccard similarity at or above which haiku are near-duplicates
+DEFAULT_THRESHOLD = 0.7
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+DENSIFY_STEP = 0x9E3779B1
+
+WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+# =================================================
+# Shingling
+# =================================================
+
+def normalize_text(lines: Iterable[str]) -> str:
+    """
+    Lowercase and reduce haiku lines to single-space separated words.
+    """
+    return " ".join(WORD_RE.findall(" ".join(lines).lower()))
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> List[int]:
+    """
+    Return stable 32-bit hashes of the distinct character shingles of text.
+    """
+    if len(text) <= size:
+        grams = {text}
+    else:
+        grams = {text[i:i + size] for i in range(len(text) - size + 1)}
+    return [zlib.crc32(g.encode("utf-8")) for g in grams]
+
+
+# =================================================
+# Index
+# =================================================
+
+class SimilarityIndex:
+    """
+    MinHash/LSH index of haiku signatures keyed by haiku id.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = NUM_PERM,
+        bands: int = BANDS,
+        shingle_size: int = SHINGLE_SIZE,
+        seed: int = SEED,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.seed = seed
+
+        rng = random.Random(seed)
+        self._perm = (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+
+        self.signatures: Dict[str, array] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[str]] = {}
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def __contains__(self, haiku_id: str) -> bool:
+        return haiku_id in self.signatures
+
+    # ----------------------------
+    # Signatures
+    # ----------------------------
+    def signature(self, lines: Iterable[str]) -> array:
+        """
+        One-permutation MinHash: each shingle is hashed once and kept as the
+        minimum of its bin; empty bins borrow from the next non-empty bin
+        (rotation densification) so every position stays comparable.
+        """
+        a, b = self._perm
+        num_perm = self.num_perm
+        bins = [-1] * num_perm
+
+        for h in shingle_hashes(normalize_text(lines), self.shingle_size):
+            v = (a * h + b) % MERSENNE_PRIME
+            slot, value = v % num_perm, v // num_perm
+            if bins[slot] < 0 or value < bins[slot]:
+                bins[slot] = value
+
+        sig = array("I", [0]) * num_perm
+        for slot in range(num_perm):
+            offset = 0
+            while bins[(slot + offset) % num_perm] < 0:
+                offset += 1
+            sig[slot] = (bins[(slot + offset) % num_perm] + offset * DENSIFY_STEP) & MAX_HASH
+        return sig
+
+    def _band_keys(self, sig: array):
+        raw = sig.tobytes()
+        width = self.rows * sig.itemsize
+        for band in range(self.bands):
+            yield band, raw[band * width:(band + 1) * width]
+
+    # ----------------------------
+    # Updates
+    # ----------------------------
+    def add(self, haiku_id: str, lines: Iterable[str]) -> None:
+        self.add_signature(haiku_id, self.signature(lines))
+
+    def add_signature(self, haiku_id: str, sig: array) -> None:
+        if haiku_id in self.signatures:
+            self.remove(haiku_id)
+        self.signatures[haiku_id] = sig
+        for key in self._band_keys(sig):
+            self._buckets.setdefault(key, []).append(haiku_id)
+        self.dirty = True
+
+    def remove(self, haiku_id: str) -> None:
+        sig = self.signatures.pop(haiku_id, None)
+        if sig is None:
+            return
+        for key in self._band_keys(sig):
+            bucket = self._buckets.get(key)
+            if bucket and haiku_id in bucket:
+                bucket.remove(haiku_id)
+                if not bucket:
+                    del self._buckets[key]
+        self.dirty = True
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def query(
+        self,
+        lines: Iterable[str],
+        threshold: float = DEFAULT_THRESHOLD,
+        exclude: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Return (haiku id, estimated similarity) pairs at or above threshold.
+
+        Candidates sharing the most LSH bands are scored first; with a limit
+        the search stops once that many matches are found, so a yes/no check
+        stays cheap even inside clusters of near-identical haiku.
+        """
+        sig = self.signature(lines)
+
+        shared = Counter()
+        for key in self._band_keys(sig):
+            shared.update(self._buckets.get(key, ()))
+        shared.pop(exclude, None)
+
+        matches = []
+        for haiku_id, _ in shared.most_common():
+            other = self.signatures[haiku_id]
+            score = sum(map(int.__eq__, sig, other)) / self.num_perm
+            if score >= threshold:
+                matches.append((haiku_id, score))
+                if limit and len(matches) >= limit:
+                    break
+
+        return sorted(matches, key=lambda m: (-m[1], m[0]))
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        out = {
+            "version": INDEX_VERSION,
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "shingle_size": self.shingle_size,
+            "seed": self.seed,
+            "signatures": {
+                haiku_id: base64.b64encode(sig.tobytes()).decode("ascii")
+                for haiku_id, sig in sorted(self.signatures.items())
+            },
+        }
+        path.write_text(json.dumps(out, indent=2), encoding="utf-8")
+        self.dirty = False
+        logger.info(f"Saved similarity index ({len(self)} haiku) to {path}")
+
+    @classmethod
+    def load(cls, path: Path) -> "SimilarityIndex":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported similarity index version in {path}")
+
+        index = cls(
+            num_perm=data["num_perm"],
+            bands=data["bands"],
+            shingle_size=data["shingle_size"],
+            seed=data["seed"],
+        )
+        for haiku_id, encoded in data["signatures"].items():
+            sig = array("I")
+            sig.frombytes(base64.b64decode(encoded))
+            index.add_signature(haiku_id, sig)
+        index.dirty = False
+        return index
+
+    @classmethod
+    def load_or_create(cls, path: Path) -> "SimilarityIndex":
+        if path.exists():
+            return cls.load(path)
+        logger.info(f"Similarity index not found, starting empty: {path}")
+        return cls()
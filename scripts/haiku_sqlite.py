@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+haiku_sqlite — optional SQLite index of the haiku corpus.
+
+Mirrors the per-haiku JSON files into three tables:
+
+    haiku     one row per haiku (metadata and lines)
+    tags      one row per distinct tag
+    postings  (tag, haiku) pairs
+
+Aggregate phases can then answer "latest haiku", "all tags with their
+haiku" and "manifest items" with indexed queries instead of walking and
+re-parsing data/. The JSON files remain canonical; this is a derived
+index that can be rebuilt from them at any time.
+"""
+
+import json
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("haiku-sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS haiku (
+    id        TEXT PRIMARY KEY,
+    date      TEXT NOT NULL,
+    seq       INTEGER NOT NULL,
+    title     TEXT NOT NULL,
+    lines     TEXT NOT NULL,
+    path_html TEXT NOT NULL,
+    path_json TEXT NOT NULL,
+    created   TEXT
+);
+CREATE INDEX IF NOT EXISTS haiku_date_seq ON haiku (date, seq);
+
+CREATE TABLE IF NOT EXISTS tags (
+    tag_id INTEGER PRIMARY KEY,
+    tag    TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS postings (
+    tag_id   INTEGER NOT NULL REFERENCES tags (tag_id),
+    haiku_id TEXT NOT NULL REFERENCES haiku (id) ON DELETE CASCADE,
+    PRIMARY KEY (tag_id, haiku_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_haiku ON postings (haiku_id);
+"""
+
+
+class CorpusIndex:
+    """
+    Connection wrapper around the SQLite corpus index.
+    Use as a context manager to commit on success; work that must survive
+    a later failure (pages already written to disk) is committed early
+    with commit().
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._tag_ids: Dict[str, int] = {}
+
+    def __enter__(self) -> "CorpusIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.conn.commit()
+        else:
+            self.conn.rollback()
+        self.conn.close()
+
+    # ----------------------------
+    # Updates
+    # ----------------------------
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def _tag_id(self, tag: str) -> int:
+        tag_id = self._tag_ids.get(tag)
+        if tag_id is None:
+            self.conn.execute("INSERT OR IGNORE INTO tags (tag) VALUES (?)", (tag,))
+            tag_id = self.conn.execute(
+                "SELECT tag_id FROM tags WHERE tag = ?", (tag,)
+            ).fetchone()[0]
+            self._tag_ids[tag] = tag_id
+        return tag_id
+
+    def upsert(self, entry: dict, tags: Iterable[str]) -> None:
+        """
+        Insert or replace one haiku (a page JSON dict) and its postings.
+        """
+        self.conn.execute(
+            "INSERT OR REPLACE INTO haiku "
+            "(id, date, seq, title, lines, path_html, path_json, created) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                entry["id"],
+                entry["date"],
+                int(entry["seq"]),
+                entry.get("title", ""),
+                json.dumps(entry.get("lines", [])),
+                entry["path_html"],
+                entry["path_json"],
+                entry.get("created"),
+            ),
+        )
+        self.conn.execute("DELETE FROM postings WHERE haiku_id = ?", (entry["id"],))
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO postings (tag_id, haiku_id) VALUES (?, ?)",
+            [(self._tag_id(tag), entry["id"]) for tag in tags],
+        )
+
+    def delete_range(self, start: str, end: str) -> int:
+        """
+        Remove haiku dated within [start, end] (and their postings).
+        """
+        cur = self.conn.execute(
+            "DELETE FROM haiku WHERE date BETWEEN ? AND ?", (start, end)
+        )
+        return cur.rowcount
+
+    def clear(self) -> None:
+        self.conn.execute("DELETE FROM postings")
+        self.conn.execute("DELETE FROM haiku")
+        self.conn.execute("DELETE FROM tags")
+        self._tag_ids.clear()
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def _tags_by_haiku(self) -> Dict[str, List[str]]:
+        tags: Dict[str, List[str]] = {}
+        for haiku_id, tag in self.conn.execute(
+            "SELECT p.haiku_id, t.tag FROM postings p "
+            "JOIN tags t ON t.tag_id = p.tag_id "
+            "ORDER BY p.haiku_id, t.tag"
+        ):
+            tags.setdefault(haiku_id, []).append(tag)
+        return tags
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM haiku").fetchone()[0]
+
+    def latest(self) -> Optional[dict]:
+        row = self.conn.execute(
+            "SELECT id, date, seq, path_html FROM haiku "
+            "ORDER BY date DESC, seq DESC LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "date": row[1], "seq": row[2], "path_html": row[3]}
+
+    def entries(self) -> List[dict]:
+        """
+        Return every haiku as {id, date, seq, lines, tags}, ordered by id.
+        """
+        tags = self._tags_by_haiku()
+
+        return [
+            {
+                "id": haiku_id,
+                "date": date,
+                "seq": seq,
+                "lines": json.loads(lines),
+                "tags": tags.get(haiku_id, []),
+            }
+            for haiku_id, date, seq, lines in self.conn.execute(
+                "SELECT id, date, seq, lines FROM haiku ORDER BY id"
+            )
+        ]
+
+    def tag_postings(self) -> List[Tuple[str, List[str]]]:
+        """
+        Return (tag, [haiku ids]) for every tag with at least one posting.
+        """
+        postings: Dict[str, List[str]] = {}
+        for tag, haiku_id in self.conn.execute(
+            "SELECT t.tag, p.haiku_id FROM postings p "
+            "JOIN tags t ON t.tag_id = p.tag_id "
+            "ORDER BY p.tag_id, p.haiku_id"
+        ):
+            postings.setdefault(tag, []).append(haiku_id)
+        return list(postings.items())
+
+    def manifest_items(self) -> List[dict]:
+        tags = self._tags_by_haiku()
+
+        return [
+            {
+                "id": haiku_id,
+                "title": title,
+                "path_html": path_html,
+                "path_json": path_json,
+                "tags": tags.get(haiku_id, []),
+            }
+            for haiku_id, title, path_html, path_json in self.conn.execute(
+                "SELECT id, title, path_html, path_json FROM haiku ORDER BY id"
+            )
+        ]
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+haiku_syllables — local syllable counting for haiku lines.
+
+Counts come from the CMU pronouncing dictionary (via NLTK) when it is
+available, and from a vowel-group heuristic for words it does not know
+(or for every word, with a warning, when it cannot be loaded). The
+dictionary is reduced once into a compact word -> syllable-count table,
+and per-word results are memoized, so validating large seed batches
+stays cheap.
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+logger = logging.getLogger("haiku-syllables")
+
+# Required 5-7-5 pattern (see config/haiku.instructions.txt)
+HAIKU_SYLLABLES = (5, 7, 5)
+
+WORD_RE = re.compile(r"[a-z]+(?:'[a-z]+)*")
+VOWEL_GROUP_RE = re.compile(r"[aeiouy]+")
+
+# Plural/verb endings where "es" is pronounced as its own syllable
+SYLLABIC_ES = ("ces", "ges", "ses", "xes", "zes", "ches", "shes")
+
+
+# =================================================
+# Pronunciation table
+# =================================================
+
+@lru_cache(maxsize=None)
+def load_pronunciation_table() -> Dict[str, Tuple[int, ...]]:
+    """
+    Load the CMU dictionary once and reduce it to word -> syllable counts.
+
+    Only the distinct syllable counts of each word are kept (one small
+    shared tuple per distinct set), not the phonemes themselves.
+    Returns an empty table (with a warning) when NLTK or the cmudict
+    corpus is unavailable; callers can check this with has_pronunciations.
+    """
+    try:
+        import nltk
+        try:
+            nltk.data.find("corpora/cmudict")
+        except LookupError:
+            logger.info("NLTK setup: downloading cmudict")
+            if not nltk.download("cmudict", quiet=True):
+                logger.warning("NLTK setup: cmudict download failed")
+        from nltk.corpus import cmudict
+        entries = cmudict.dict()
+    except Exception as e:
+        logger.warning(
+            f"cmudict unavailable, counting syllables with the spelling "
+            f"heuristic only (less accurate): {e}"
+        )
+        return {}
+
+    shared: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+    table: Dict[str, Tuple[int, ...]] = {}
+
+    for word, prons in entries.items():
+        counts = tuple(sorted({
+            sum(1 for phone in pron if phone[-1].isdigit())
+            for pron in prons
+        }))
+        table[word] = shared.setdefault(counts, counts)
+
+    logger.debug(f"Loaded {len(table)} pronunciations")
+    return table
+
+
+def has_pronunciations() -> bool:
+    """
+    True when counts come from cmudict (not only the heuristic).
+    """
+    return bool(load_pronunciation_table())
+
+
+# =================================================
+# Counting
+# =================================================
+
+def estimate_syllables(word: str) -> int:
+    """
+    Estimate syllables from spelling: vowel groups minus common silent endings.
+    """
+    word = word.replace("'", "")
+    if not word:
+        return 0
+
+    count = len(VOWEL_GROUP_RE.findall(word))
+
+    if len(word) > 2 and count > 1:
+        if word.endswith("e") and not word.endswith(("le", "ee", "ye")):
+            # silent final e: "stone", "wave"
+            count -= 1
+        elif word.endswith("le") and word[-3] in "aeiouy":
+            # "whale", "mile"
+            count -= 1
+        elif (word.endswith("es") and word[-3] not in "aeiouy"
+              and not word.endswith(SYLLABIC_ES)):
+            # "stones", "breathes" (but not "roses", "branches")
+            count -= 1
+        elif word.endswith("ed") and word[-3] not in "aeiouytd":
+            # "walked", "turned"
+            count -= 1
+
+    return max(1, count)
+
+
+@lru_cache(maxsize=65536)
+def word_syllables(word: str) -> Tuple[int, ...]:
+    """
+    Return the possible syllable counts for a single lowercase word.
+    """
+    counts = load_pronunciation_table().get(word)
+    if counts:
+        return counts
+    if "'" in word:
+        # "wind's" -> "wind"
+        counts = load_pronunciation_table().get(word.split("'")[0])
+        if counts:
+            return counts
+    return (estimate_syllables(word),)
+
+
+def line_syllables(line: str) -> Set[int]:
+    """
+    Return every syllable total a line can have, given alternate pronunciations.
+    """
+    totals = {0}
+    for word in WORD_RE.findall(line.lower()):
+        counts = word_syllables(word)
+        totals = {t + c for t in totals for c in counts}
+    return totals
+
+
+def syllable_mismatches(
+    lines: Iterable[str],
+    pattern: Sequence[int] = HAIKU_SYLLABLES,
+) -> List[Tuple[int, str, int, List[int]]]:
+    """
+    Compare lines against a syllable pattern.
+
+    Returns (line number, line, expected, possible counts) for each
+    line that cannot meet its expected count.
+    """
+    mismatches = []
+    for number, (line, expected) in enumerate(zip(lines, pattern), start=1):
+        totals = line_syllables(line)
+        if expected not in totals:
+            mismatches.append((number, line, expected, sorted(totals)))
+    return mismatches